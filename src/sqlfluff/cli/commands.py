@@ -24,12 +24,16 @@ from .formatters import (
     colorize,
     format_dialect_warning,
     format_dialects,
+    format_grammar_profile,
+    format_rule_timings,
     CallbackFormatter,
 )
 from .helpers import cli_table, get_package_version
+from .serializers import iter_parse_record_events, iter_json_chunks, iter_yaml_chunks
 
 # Import from sqlfluff core.
 from ..core import Linter, FluffConfig, SQLLintError, dialect_selector, dialect_readout
+from ..core.parser import ParseProfiler
 
 
 class RedWarningsFilter(logging.Filter):
@@ -217,6 +221,17 @@ def get_linter_and_formatter(cfg, silent=False):
         return Linter(config=cfg), formatter
 
 
+def echo_chunks(chunks, nl=False, batch_size=1000):
+    """Echo an iterable of text chunks, a batch at a time."""
+    buffer = []
+    for chunk in chunks:
+        buffer.append(chunk)
+        if len(buffer) >= batch_size:
+            click.echo("".join(buffer), nl=False)
+            buffer = []
+    click.echo("".join(buffer), nl=nl)
+
+
 @click.group()
 @click.version_option()
 def cli():
@@ -279,8 +294,24 @@ def dialects(**kwargs):
     is_flag=True,
     help=("Perform the operation regardless of .sqlfluffignore configurations"),
 )
+@click.option(
+    "--rule-timings",
+    is_flag=True,
+    help=(
+        "Output a table of how long was spent in each rule, and how many "
+        "evaluations, violations and fixes it had."
+    ),
+)
 @click.argument("paths", nargs=-1)
-def lint(paths, format, nofail, disregard_sqlfluffignores, logger=None, **kwargs):
+def lint(
+    paths,
+    format,
+    nofail,
+    disregard_sqlfluffignores,
+    rule_timings,
+    logger=None,
+    **kwargs
+):
     """Lint SQL files via passing a list of files or using stdin.
 
     PATH is the path to a sql file or directory to lint. This can be either a
@@ -341,6 +372,9 @@ def lint(paths, format, nofail, disregard_sqlfluffignores, logger=None, **kwargs
     elif format == "yaml":
         click.echo(yaml.dump(result.as_records()))
 
+    if rule_timings:
+        click.echo(format_rule_timings(result))
+
     if not nofail:
         sys.exit(result.stats()["exit code"])
     else:
@@ -375,8 +409,24 @@ def do_fixes(lnt, result, formatter=None, **kwargs):
 @click.option(
     "--fixed-suffix", default=None, help="An optional suffix to add to fixed files."
 )
+@click.option(
+    "--rule-timings",
+    is_flag=True,
+    help=(
+        "Output a table of how long was spent in each rule, and how many "
+        "evaluations, violations and fixes it had (over all the fix loops)."
+    ),
+)
 @click.argument("paths", nargs=-1)
-def fix(force, paths, bench=False, fixed_suffix="", logger=None, **kwargs):
+def fix(
+    force,
+    paths,
+    bench=False,
+    fixed_suffix="",
+    rule_timings=False,
+    logger=None,
+    **kwargs
+):
     """Fix SQL files.
 
     PATH is the path to a sql file or directory to lint. This can be either a
@@ -475,6 +525,9 @@ def fix(force, paths, bench=False, fixed_suffix="", logger=None, **kwargs):
                 )
             )
 
+    if rule_timings:
+        click.echo(format_rule_timings(result))
+
     if bench:
         click.echo("\n\n==== bencher stats ====")
         bencher.display()
@@ -502,9 +555,37 @@ def fix(force, paths, bench=False, fixed_suffix="", logger=None, **kwargs):
     type=click.Choice(["human", "json", "yaml"], case_sensitive=False),
     help="What format to return the parse result in.",
 )
+@click.option(
+    "--stream",
+    is_flag=True,
+    help=(
+        "Output each result as soon as it is parsed, rather than all together "
+        "at the end. For json this outputs one json object per line, and for "
+        "yaml one document per result. With the raw templater, files (and "
+        "stdin, which is read as it goes) are parsed and output one statement "
+        "at a time."
+    ),
+)
 @click.option(
     "--profiler", is_flag=True, help="Set this flag to engage the python profiler."
 )
+@click.option(
+    "--profile-grammar",
+    is_flag=True,
+    help=(
+        "Set this flag to profile the parser by grammar and segment name, "
+        "rather than by python function."
+    ),
+)
+@click.option(
+    "--profile-grammar-format",
+    default="table",
+    type=click.Choice(["table", "json"], case_sensitive=False),
+    help=(
+        "What format to output the grammar profile in. It goes to stderr, "
+        "so as not to get mixed up with the parse output."
+    ),
+)
 @click.option(
     "--nofail",
     is_flag=True,
@@ -513,7 +594,19 @@ def fix(force, paths, bench=False, fixed_suffix="", logger=None, **kwargs):
         "found. This is potentially useful during rollout."
     ),
 )
-def parse(path, code_only, format, profiler, bench, nofail, logger=None, **kwargs):
+def parse(
+    path,
+    code_only,
+    format,
+    stream,
+    profiler,
+    profile_grammar,
+    profile_grammar_format,
+    bench,
+    nofail,
+    logger=None,
+    **kwargs
+):
     """Parse SQL files and just spit out the result.
 
     PATH is the path to a sql file or directory to lint. This can be either a
@@ -546,20 +639,54 @@ def parse(path, code_only, format, profiler, bench, nofail, logger=None, **kwarg
         pr = cProfile.Profile()
         pr.enable()
 
+    # Set up the grammar profiler if required
+    grammar_profiler = ParseProfiler() if profile_grammar else None
+
+    if stream and not lnt.can_process_by_statement():
+        # NB: This goes to stderr, so as not to get mixed up with the output.
+        click.echo(
+            colorize(
+                "Files can only be parsed one statement at a time with the raw "
+                "templater (and a dialect whose statements end with semicolons), "
+                "so each file will be parsed whole before it is output.",
+                "red",
+            ),
+            err=True,
+        )
+
     bencher("Parse setup")
     try:
         # handle stdin if specified via lone '-'
-        if "-" == path:
+        if "-" == path and stream and lnt.can_process_by_statement():
+            # Parse and output one statement at a time.
+            result = (
+                lnt.parse_string(
+                    statement,
+                    "stdin",
+                    recurse=recurse,
+                    config=lnt.config,
+                    profiler=grammar_profiler,
+                    start_pos=start_pos,
+                )
+                for statement, start_pos in lnt.iter_stream_statements(sys.stdin.buffer)
+            )
+        elif "-" == path:
             # put the parser result in a list to iterate later
             result = [
                 lnt.parse_string(
-                    sys.stdin.read(), "stdin", recurse=recurse, config=lnt.config
+                    sys.stdin.read(),
+                    "stdin",
+                    recurse=recurse,
+                    config=lnt.config,
+                    profiler=grammar_profiler,
                 ),
             ]
         else:
             # A single path must be specified for this command
             # TODO: Remove verbose
-            result = lnt.parse_path(path, recurse=recurse)
+            result = lnt.parse_path(
+                path, recurse=recurse, profiler=grammar_profiler, by_statement=stream
+            )
 
         # iterative print for human readout
         if format == "human":
@@ -584,35 +711,32 @@ def parse(path, code_only, format, profiler, bench, nofail, logger=None, **kwarg
                     click.echo(cli_table(parsed_string.time_dict.items()))
                 bencher("Output details for file")
         else:
-            # collect result and print as single payload
-            # will need to zip in the file paths
-            filepaths = ["stdin"] if "-" == path else lnt.paths_from_path(path)
-            result = [
-                dict(
-                    filepath=filepath,
-                    segments=parsed.as_record(code_only=code_only, show_raw=True),
-                )
-                for filepath, (parsed, _, _, _, _) in zip(filepaths, result)
-            ]
-
-            if format == "yaml":
-                # For yaml dumping always dump double quoted strings if they contain tabs or newlines.
-                def quoted_presenter(dumper, data):
-                    """Re-presenter which always double quotes string values needing escapes."""
-                    if "\n" in data or "\t" in data or "'" in data:
-                        return dumper.represent_scalar(
-                            "tag:yaml.org,2002:str", data, style='"'
-                        )
+            # Serialize the records straight from the trees, without building
+            # a nested record for each one first.
+            if stream:
+                # Output each file as soon as it's parsed.
+                for parsed_string in result:
+                    events = iter_parse_record_events(
+                        parsed_string, code_only=code_only
+                    )
+                    if format == "yaml":
+                        echo_chunks(iter_yaml_chunks(events, explicit_start=True))
                     else:
-                        return dumper.represent_scalar(
-                            "tag:yaml.org,2002:str", data, style=""
-                        )
+                        echo_chunks(iter_json_chunks(events), nl=True)
+            else:
 
-                yaml.add_representer(str, quoted_presenter)
+                def iter_events():
+                    yield ("seq_start", None)
+                    for parsed_string in result:
+                        yield from iter_parse_record_events(
+                            parsed_string, code_only=code_only
+                        )
+                    yield ("seq_end", None)
 
-                click.echo(yaml.dump(result))
-            elif format == "json":
-                click.echo(json.dumps(result))
+                if format == "yaml":
+                    echo_chunks(iter_yaml_chunks(iter_events()), nl=True)
+                else:
+                    echo_chunks(iter_json_chunks(iter_events()), nl=True)
     except IOError:
         click.echo(
             colorize(
@@ -631,6 +755,14 @@ def parse(path, code_only, format, profiler, bench, nofail, logger=None, **kwarg
         # Only print the first 50 lines of it
         click.echo("\n".join(profiler_buffer.getvalue().split("\n")[:50]))
 
+    if grammar_profiler:
+        # NB: This goes to stderr, so that the output (e.g. as json or
+        # yaml) can still be read by itself.
+        if profile_grammar_format == "json":
+            click.echo(json.dumps(grammar_profiler.as_records()), err=True)
+        else:
+            click.echo(format_grammar_profile(grammar_profiler), err=True)
+
     if bench:
         click.echo("\n\n==== bencher stats ====")
         bencher.display()
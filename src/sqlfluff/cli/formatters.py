@@ -170,6 +170,95 @@ def format_dialects(dialect_readout, verbose=0):
     return text_buffer.getvalue()
 
 
+def format_grammar_profile(profiler, limit=50):
+    """Format a ranked table of the records in a `ParseProfiler`."""
+    text_buffer = StringIO()
+    text_buffer.write("==== grammar profile ====\n")
+    columns = [
+        ("calls", "{0:d}"),
+        ("cumulative_time", "{0:.4f}"),
+        ("self_time", "{0:.4f}"),
+        ("memo_hits", "{0:d}"),
+        ("memo_misses", "{0:d}"),
+        ("tokens_attempted", "{0:d}"),
+        ("tokens_matched", "{0:d}"),
+    ]
+    headers = [
+        "calls",
+        "cumtime",
+        "selftime",
+        "memo hit",
+        "memo miss",
+        "attempted",
+        "matched",
+    ]
+    records = profiler.records(sort_by="self_time", limit=limit)
+    name_width = max([len("name")] + [len(r.kind) + len(r.name) + 1 for r in records])
+    text_buffer.write(
+        colorize(
+            pad_line("name", name_width)
+            + "".join(pad_line(h, 11, align="right") for h in headers),
+            "lightgrey",
+        )
+        + "\n"
+    )
+    for record in records:
+        text_buffer.write(
+            pad_line("{0}:{1}".format(record.kind, record.name), name_width)
+            + "".join(
+                pad_line(fmt.format(getattr(record, attr)), 11, align="right")
+                for attr, fmt in columns
+            )
+            + "\n"
+        )
+    return text_buffer.getvalue()
+
+
+def format_rule_timings(result):
+    """Format a ranked table of the timings for each rule in a `LintingResult`."""
+    text_buffer = StringIO()
+    text_buffer.write("==== rule timings ====\n")
+    all_stats = result.stats()
+    columns = [
+        ("time", "{0:.4f}"),
+        ("evals", "{0:d}"),
+        ("violations", "{0:d}"),
+        ("fixes", "{0:d}"),
+    ]
+    # The slowest rules first.
+    rule_timings = sorted(
+        all_stats["rules"].items(), key=lambda item: (-item[1]["time"], item[0])
+    )
+    name_width = max([len("rule")] + [len(code) + 1 for code, _ in rule_timings])
+    text_buffer.write(
+        colorize(
+            pad_line("rule", name_width)
+            + "".join(pad_line(attr, 11, align="right") for attr, _ in columns),
+            "lightgrey",
+        )
+        + "\n"
+    )
+    for code, timings in rule_timings:
+        text_buffer.write(
+            pad_line(code, name_width)
+            + "".join(
+                pad_line(fmt.format(timings[attr]), 11, align="right")
+                for attr, fmt in columns
+            )
+            + "\n"
+        )
+    if all_stats["fix_loops"]:
+        text_buffer.write("fix loops: {0}\n".format(all_stats["fix_loops"]))
+    cache_stats = all_stats["statement_cache"]
+    if cache_stats.get("hits") or cache_stats.get("misses"):
+        text_buffer.write(
+            "statement cache: {0} hits, {1} misses\n".format(
+                cache_stats["hits"], cache_stats["misses"]
+            )
+        )
+    return text_buffer.getvalue()
+
+
 def format_dialect_warning():
     """Output a warning for parsing errors found on the ansi dialect."""
     return colorize(
@@ -0,0 +1,128 @@
+"""Streaming serializers for the json and yaml outputs of `sqlfluff parse`.
+
+These write the records from a stream of events (as produced by
+`BaseSegment.iter_record_events`), so that we never need to build the
+whole record for a tree in memory. The output is the same as calling
+`json.dumps` or `yaml.dump` on the records (with `oyaml`, which keeps
+the keys of each mapping in order).
+"""
+
+from json.encoder import encode_basestring_ascii  # type: ignore
+
+import oyaml as yaml
+
+
+class RecordDumper(yaml.Dumper):
+    """A yaml dumper which double quotes strings needing escapes."""
+
+
+def _quoted_presenter(dumper, data):
+    """Re-presenter which always double quotes string values needing escapes."""
+    if "\n" in data or "\t" in data or "'" in data:
+        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style='"')
+    else:
+        return dumper.represent_scalar("tag:yaml.org,2002:str", data, style="")
+
+
+RecordDumper.add_representer(str, _quoted_presenter)
+
+
+def iter_parse_record_events(parsed_string, code_only=False):
+    """Iterate the events for the record of a `ParsedString`."""
+    yield ("map_start", None)
+    yield ("scalar", "filepath")
+    yield ("scalar", parsed_string.fname)
+    yield ("scalar", "segments")
+    if parsed_string.tree:
+        yield from parsed_string.tree.iter_record_events(
+            code_only=code_only, show_raw=True
+        )
+    else:
+        yield ("scalar", None)
+    yield ("map_end", None)
+
+
+def iter_json_chunks(events):
+    """Iterate the chunks of json text for a stream of events."""
+    # For each open container, whether it's a map, and how many
+    # elements (including keys) it has so far.
+    stack = []
+    for kind, value in events:
+        if kind.endswith("_end"):
+            stack.pop()
+            yield "}" if kind == "map_end" else "]"
+            continue
+        sep = ""
+        if stack:
+            container = stack[-1]
+            if container[0] and container[1] % 2:
+                sep = ": "
+            elif container[1]:
+                sep = ", "
+            container[1] += 1
+        if kind == "scalar":
+            if value is None:
+                yield sep + "null"
+            else:
+                # This is what json.dumps uses for strings (by default).
+                yield sep + encode_basestring_ascii(value)
+        elif kind == "map_start":
+            stack.append([True, 0])
+            yield sep + "{"
+        else:
+            stack.append([False, 0])
+            yield sep + "["
+
+
+class _ChunkStream:
+    """A stream for the yaml emitter to write to, which we then drain."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def flush(self):
+        pass
+
+
+def iter_yaml_chunks(events, explicit_start=False):
+    """Iterate the chunks of yaml text for a stream of events."""
+    stream = _ChunkStream()
+    dumper = RecordDumper(
+        stream, default_flow_style=False, explicit_start=explicit_start
+    )
+    dumper.emit(yaml.StreamStartEvent())
+    dumper.emit(yaml.DocumentStartEvent(explicit=explicit_start))
+    for kind, value in events:
+        if kind == "scalar":
+            # Represent scalars as yaml.dump would, so they're quoted
+            # and tagged in the same way.
+            node = dumper.represent_data(value)
+            implicit = (
+                node.tag == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+                node.tag == dumper.resolve(yaml.ScalarNode, node.value, (False, True)),
+            )
+            event = yaml.ScalarEvent(
+                None, node.tag, implicit, node.value, style=node.style
+            )
+        elif kind == "map_start":
+            event = yaml.MappingStartEvent(
+                None, "tag:yaml.org,2002:map", True, flow_style=False
+            )
+        elif kind == "seq_start":
+            event = yaml.SequenceStartEvent(
+                None, "tag:yaml.org,2002:seq", True, flow_style=False
+            )
+        elif kind == "map_end":
+            event = yaml.MappingEndEvent()
+        else:
+            event = yaml.SequenceEndEvent()
+        dumper.emit(event)
+        if stream.chunks:
+            yield from stream.chunks
+            stream.chunks = []
+    dumper.emit(yaml.DocumentEndEvent(explicit=False))
+    dumper.emit(yaml.StreamEndEvent())
+    yield from stream.chunks
@@ -245,6 +245,18 @@ class Dialect:
         # Overwrite with the buffer once we're done
         self.lexer_struct = buff
 
+    def get_segment_names(self):
+        """Get a dict of the segment classes in this dialect to their names.
+
+        NB: If a class is in the library under more than one name, only
+        one of them is returned, but any will `ref` to the same class.
+        """
+        return {
+            elem: name
+            for name, elem in self._library.items()
+            if isinstance(elem, type)
+        }
+
     def get_root_segment(self):
         """Get the root segment of the dialect."""
         return self.ref(self.root_segment_name)
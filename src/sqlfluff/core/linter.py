@@ -1,5 +1,7 @@
 """Defines the linter class."""
 
+from concurrent.futures import ProcessPoolExecutor
+import mmap
 import os
 import time
 import logging
@@ -30,8 +32,14 @@ from .errors import (
     SQLParseError,
     CheckTuple,
 )
-from .parser import Lexer, Parser
-from .string_helpers import findall
+from .parser import Lexer, Parser, FilePositionMarker
+from .parser.profiler import ParseProfiler
+from .string_helpers import (
+    findall,
+    can_split_statements,
+    iter_statement_chunks,
+    iter_stream_statement_chunks,
+)
 from .templaters import TemplatedFile
 from .rules import get_ruleset
 from .config import FluffConfig, ConfigLoader
@@ -40,7 +48,9 @@ from .config import FluffConfig, ConfigLoader
 from .parser.segments.base import BaseSegment, FixPatch
 from .parser.segments.indent import MetaSegment
 from .parser.segments.raw import RawSegment
-from .rules.base import BaseCrawler
+from .rules.base import BaseCrawler, MultiCrawler
+from .rules.cache import StatementCache
+from .rules.parallel import ParallelCrawler
 
 # Instantiate the linter logger
 linter_logger: logging.Logger = logging.getLogger("sqlfluff.linter")
@@ -64,6 +74,7 @@ class ParsedString(NamedTuple):
     time_dict: dict
     templated_file: TemplatedFile
     config: FluffConfig
+    fname: Optional[str] = None
 
 
 class EnrichedFixPatch(NamedTuple):
@@ -448,6 +459,10 @@ class LintedFile(NamedTuple):
 
     def persist_tree(self, suffix: str = "") -> bool:
         """Persist changes to the given path."""
+        # Files linted without keeping their tree (i.e. large files
+        # linted one statement at a time) can't be fixed.
+        if not self.tree:
+            return False
         write_buff, success = self.fix_string()
 
         if success:
@@ -518,13 +533,29 @@ class LintedPath:
         """Return a dict of violations by file path."""
         return {file.path: file.get_violations(**kwargs) for file in self.files}
 
-    def stats(self) -> Dict[str, int]:
-        """Return a dict containing linting stats about this path."""
+    def stats(self) -> Dict[str, Any]:
+        """Return a dict containing linting stats about this path.
+
+        This includes the `rules` timings, the `fix_loops` and the
+        `statement_cache` hits and misses from the time dicts of the files.
+        """
+        rule_timings: Dict[str, Any] = {}
+        cache_stats: Dict[str, int] = dict(hits=0, misses=0)
+        for file in self.files:
+            rule_timings = LintingResult.sum_dicts(
+                rule_timings, file.time_dict.get("rules", {})
+            )
+            cache_stats = LintingResult.sum_dicts(
+                cache_stats, file.time_dict.get("statement_cache", {})
+            )
         return dict(
             files=len(self.files),
             clean=sum(file.is_clean() for file in self.files),
             unclean=sum(not file.is_clean() for file in self.files),
             violations=sum(file.num_violations() for file in self.files),
+            fix_loops=sum(file.time_dict.get("fix_loops", 0) for file in self.files),
+            rules=rule_timings,
+            statement_cache=cache_stats,
         )
 
     def persist_changes(
@@ -570,9 +601,21 @@ class LintingResult:
 
     @staticmethod
     def sum_dicts(d1: Dict[str, Any], d2: Dict[str, Any]) -> Dict[str, Any]:
-        """Take the keys of two dictionaries and add them."""
+        """Take the keys of two dictionaries and add them.
+
+        Values which are dicts themselves (like the timings for each
+        rule) are added recursively.
+        """
         keys = set(d1.keys()) | set(d2.keys())
-        return {key: d1.get(key, 0) + d2.get(key, 0) for key in keys}
+        summed: Dict[str, Any] = {}
+        for key in keys:
+            v1 = d1.get(key, 0)
+            v2 = d2.get(key, 0)
+            if isinstance(v1, dict) or isinstance(v2, dict):
+                summed[key] = LintingResult.sum_dicts(v1 or {}, v2 or {})
+            else:
+                summed[key] = v1 + v2
+        return summed
 
     @staticmethod
     def combine_dicts(*d: dict) -> dict:
@@ -640,7 +683,15 @@ class LintingResult:
 
     def stats(self) -> Dict[str, Any]:
         """Return a stats dictionary of this result."""
-        all_stats: Dict[str, Any] = dict(files=0, clean=0, unclean=0, violations=0)
+        all_stats: Dict[str, Any] = dict(
+            files=0,
+            clean=0,
+            unclean=0,
+            violations=0,
+            fix_loops=0,
+            rules={},
+            statement_cache={},
+        )
         for path in self.paths:
             all_stats = self.sum_dicts(path.stats(), all_stats)
         if all_stats["files"] > 0:
@@ -722,6 +773,20 @@ class Linter:
         self.formatter = formatter
         # Store references to user rule classes
         self.user_rules = user_rules or []
+        # Lexers and parsers are cached between files, so that we only
+        # pay the cost of setting them up once for each dialect.
+        self._lexer_cache: Dict[str, Tuple[Any, Lexer]] = {}
+        self._parser_cache: Dict[Tuple[str, str], Parser] = {}
+        # The results of rules on statements are cached between files
+        # too, because they're often repeated (e.g. in dbt projects).
+        self._statement_cache = StatementCache(
+            max_size=self.config.get("cache_statements_max_size")
+        )
+        # The workers which the rules are split between (if configured
+        # to with `rule_processes`) are started when first needed, and
+        # reused for each file until `close_rule_pool` is called.
+        self._rule_pool: Optional[ProcessPoolExecutor] = None
+        self._rule_pool_workers = 0
 
     def get_ruleset(self, config: Optional[FluffConfig] = None) -> List[BaseCrawler]:
         """Get hold of a set of rules."""
@@ -732,6 +797,60 @@ class Linter:
         cfg = config or self.config
         return rs.get_rulelist(config=cfg)
 
+    def get_rule_pool(self, processes: int) -> ProcessPoolExecutor:
+        """Get a pool of workers to split the rules between processes.
+
+        Starting processes takes much longer than crawling most files,
+        so the pool is reused until `close_rule_pool` is called (which
+        `lint_paths` does when it's finished). It's only replaced if
+        more workers are needed.
+        """
+        workers = processes - 1
+        if self._rule_pool is None or self._rule_pool_workers < workers:
+            self.close_rule_pool()
+            self._rule_pool = ProcessPoolExecutor(max_workers=workers)
+            self._rule_pool_workers = workers
+        return self._rule_pool
+
+    def close_rule_pool(self) -> None:
+        """Shut down the pool of workers for splitting the rules, if any."""
+        if self._rule_pool is not None:
+            self._rule_pool.shutdown()
+            self._rule_pool = None
+            self._rule_pool_workers = 0
+
+    def get_lexer(self, config: Optional[FluffConfig] = None) -> Lexer:
+        """Get a lexer for the dialect of the given config.
+
+        Lexers only depend on the `lexer_struct` of the dialect, so they
+        are cached by dialect. If the struct of the dialect has been
+        changed since we cached the lexer, then we make a new one.
+        """
+        cfg = config or self.config
+        dialect = cfg.get("dialect_obj")
+        lexer_struct = dialect.get_lexer_struct()
+        cached = self._lexer_cache.get(dialect.name)
+        if cached and cached[0] is lexer_struct:
+            return cached[1]
+        lexer = Lexer(config=cfg)
+        self._lexer_cache[dialect.name] = (lexer_struct, lexer)
+        return lexer
+
+    def get_parser(self, config: Optional[FluffConfig] = None) -> Parser:
+        """Get a parser for the dialect and indentation config of the given config.
+
+        These are the only parts of the config which the parser uses, so
+        parsers are cached on them.
+        """
+        cfg = config or self.config
+        dialect = cfg.get("dialect_obj")
+        indentation_config = cfg.get_section("indentation") or {}
+        key = (dialect.name, repr(sorted(indentation_config.items())))
+        parser = self._parser_cache.get(key)
+        if parser is None:
+            parser = self._parser_cache[key] = Parser(config=cfg)
+        return parser
+
     def rule_tuples(self) -> List[Tuple[str, str]]:
         """A simple pass through to access the rule tuples of the rule set."""
         rs = self.get_ruleset()
@@ -743,9 +862,19 @@ class Linter:
         fname: Optional[str] = None,
         recurse: bool = True,
         config: Optional[FluffConfig] = None,
+        profiler: Optional[ParseProfiler] = None,
+        start_pos: Optional[FilePositionMarker] = None,
     ) -> ParsedString:
         """Parse a string.
 
+        If a `ParseProfiler` is passed as `profiler`, then it will record
+        timings for each grammar and segment during the parse.
+
+        If the string is only a piece of a larger file, then `start_pos`
+        should be the position of the start of the piece within the file,
+        so that the positions of the segments and violations are relative
+        to the whole file.
+
         Returns:
             `ParsedString` of (`parsed`, `violations`, `time_dict`, `templated_file`).
                 `parsed` is a segment structure representing the parsed file. If
@@ -799,7 +928,7 @@ class Linter:
         if templated_file:
             linter_logger.info("LEXING RAW (%s)", fname)
             # Get the lexer
-            lexer = Lexer(config=config)
+            lexer = self.get_lexer(config)
             # Lex the file and log any problems
             try:
                 tokens, lex_vs = lexer.lex(templated_file)
@@ -812,6 +941,13 @@ class Linter:
         else:
             tokens = None
 
+        if start_pos:
+            for token in tokens or ():
+                token.pos_marker = token.pos_marker.offset_by(start_pos)
+            for violation in violations:
+                if getattr(violation, "pos", None):
+                    violation.pos = violation.pos.offset_by(start_pos)
+
         if tokens:
             linter_logger.info("Lexed tokens: %s", [seg.raw for seg in tokens])
         else:
@@ -866,11 +1002,13 @@ class Linter:
         t2 = time.monotonic()
         bencher("Lexing {0!r}".format(short_fname))
         linter_logger.info("PARSING (%s)", fname)
-        parser = Parser(config=config)
+        parser = self.get_parser(config)
         # Parse the file and log any problems
         if tokens:
             try:
-                parsed: Optional[BaseSegment] = parser.parse(tokens, recurse=recurse)
+                parsed: Optional[BaseSegment] = parser.parse(
+                    tokens, recurse=recurse, profiler=profiler
+                )
             except SQLParseError as err:
                 linter_logger.info("PARSING FAILED! (%s): %s", fname, err)
                 violations.append(err)
@@ -900,7 +1038,9 @@ class Linter:
         t3 = time.monotonic()
         time_dict = {"templating": t1 - t0, "lexing": t2 - t1, "parsing": t3 - t2}
         bencher("Finish parsing {0!r}".format(short_fname))
-        return ParsedString(parsed, violations, time_dict, templated_file, config)
+        return ParsedString(
+            parsed, violations, time_dict, templated_file, config, fname
+        )
 
     @staticmethod
     def extract_ignore_from_comment(comment: RawSegment):
@@ -923,19 +1063,72 @@ class Linter:
                 return (comment.pos_marker.line_no, None)
         return None
 
+    @staticmethod
+    def _record_rule_timings(
+        time_dict: Dict[str, Any], crawler: BaseCrawler, vs: list, fixes: list
+    ) -> None:
+        """Add the timings and counters for one crawl of a rule to a time dict."""
+        timings = time_dict.setdefault("rules", {}).setdefault(
+            crawler.code, dict(time=0.0, evals=0, violations=0, fixes=0)
+        )
+        timings["time"] += crawler.eval_time
+        timings["evals"] += crawler.eval_calls
+        timings["violations"] += len(vs)
+        timings["fixes"] += len(fixes)
+
     def lint(
-        self, parsed: BaseSegment, config: Optional[FluffConfig] = None
+        self,
+        parsed: BaseSegment,
+        config: Optional[FluffConfig] = None,
+        time_dict: Optional[Dict[str, Any]] = None,
     ) -> List[SQLLintError]:
-        """Lint a parsed file object."""
+        """Lint a parsed file object.
+
+        If a `time_dict` is given, then the time spent in each rule and
+        how many evaluations, violations and fixes it had, are added to
+        it under `rules`. If the statement cache is used, its `hits` and
+        `misses` are added under `statement_cache`.
+        """
         config = config or self.config
         linting_errors = []
-        for crawler in self.get_ruleset(config=config):
-            lerrs, _, _, _ = crawler.crawl(parsed, dialect=config.get("dialect_obj"))
+        cache = None
+        # Crawl the tree once, evaluating all the rules together, or
+        # split them between processes if configured to.
+        crawlers = self.get_ruleset(config=config)
+        processes = config.get("rule_processes")
+        if processes > 1:
+            multi_crawler = ParallelCrawler(
+                crawlers, processes, executor=self.get_rule_pool(processes)
+            )
+        elif config.get("cache_statements"):
+            cache = self._statement_cache
+            multi_crawler = MultiCrawler(crawlers, cache=cache)
+            hits, misses = cache.hits, cache.misses
+        else:
+            multi_crawler = MultiCrawler(crawlers)
+        results = multi_crawler.crawl(parsed, dialect=config.get("dialect_obj"))
+        if cache and time_dict is not None:
+            time_dict["statement_cache"] = dict(
+                hits=cache.hits - hits, misses=cache.misses - misses
+            )
+        for crawler, (lerrs, fixes) in zip(crawlers, results):
             linting_errors += lerrs
+            if time_dict is not None:
+                self._record_rule_timings(time_dict, crawler, lerrs, fixes)
         return linting_errors
 
-    def fix(self, parsed: BaseSegment, config: Optional[FluffConfig] = None):
-        """Fix a parsed file object."""
+    def fix(
+        self,
+        parsed: BaseSegment,
+        config: Optional[FluffConfig] = None,
+        time_dict: Optional[Dict[str, Any]] = None,
+    ):
+        """Fix a parsed file object.
+
+        If a `time_dict` is given, then the timings for each rule (as
+        for `lint`, but over all the loops) are added to it, along with
+        the number of `fix_loops`.
+        """
         # Set up our config
         config = config or self.config
         # If we're in fix mode, then we need to progressively call and reconstruct
@@ -968,6 +1161,8 @@ class Linter:
                     working, dialect=config.get("dialect_obj"), fix=True
                 )
                 linting_errors += lerrs
+                if time_dict is not None:
+                    self._record_rule_timings(time_dict, crawler, lerrs, fixes)
                 # Are there fixes to apply?
                 if fixes:
                     linter_logger.info("Applying Fixes: %s", fixes)
@@ -984,8 +1179,14 @@ class Linter:
                         # Check for infinite loops
                         if new_working.raw not in previous_versions:
                             # We've not seen this version of the file so far. Continue.
+                            # NB: Drop the index of the old tree, so that the
+                            # segments of the violations found in it don't keep
+                            # the whole tree.
+                            working.clear_type_index()
                             working = new_working
                             previous_versions.add(working.raw)
+                            # Reindex the new tree for the next rules.
+                            working.index_types()
                             changed = True
                             continue
                         # Applying these fixes took us back to a state which we've
@@ -1011,6 +1212,8 @@ class Linter:
                 "Loop limit on fixes reached [%s]. Some fixes may be overdone.",
                 loop_limit,
             )
+        if time_dict is not None:
+            time_dict["fix_loops"] = fix_loop_idx
         return working, initial_linting_errors
 
     def lint_string(
@@ -1031,6 +1234,23 @@ class Linter:
 
         # Using the new parser, read the file object.
         parsed = self.parse_string(in_str=in_str, fname=fname, config=config)
+        linted_file = self.lint_parsed(parsed, fname=fname, fix=fix, config=config)
+        self._dispatch_linted_file(linted_file, fix=fix, config=config)
+        return linted_file
+
+    def lint_parsed(
+        self,
+        parsed: ParsedString,
+        fname: str = "<string input>",
+        fix: bool = False,
+        config: Optional[FluffConfig] = None,
+    ) -> LintedFile:
+        """Lint (and optionally fix) the result of `parse_string`.
+
+        Unlike `lint_string`, this doesn't report the results to the
+        formatter.
+        """
+        config = config or self.config
         time_dict = parsed.time_dict
         vs = parsed.violations
         tree = parsed.tree
@@ -1038,6 +1258,10 @@ class Linter:
         # Look for comment segments which might indicate lines to ignore.
         ignore_buff = []
         if tree:
+            # Index the types in the tree, so that the rules (and the
+            # search for comments below) don't walk the whole tree
+            # each time they look for a type.
+            tree.index_types()
             for comment in tree.recursive_crawl("comment"):
                 if comment.name == "inline_comment":
                     ignore_entry = self.extract_ignore_from_comment(comment)
@@ -1055,9 +1279,13 @@ class Linter:
             # NB: We don't pass in the linting errors, because the fix function
             # regenerates them on each loop.
             if fix:
-                tree, initial_linting_errors = self.fix(tree, config=config)
+                tree, initial_linting_errors = self.fix(
+                    tree, config=config, time_dict=time_dict
+                )
             else:
-                initial_linting_errors = self.lint(tree, config=config)
+                initial_linting_errors = self.lint(
+                    tree, config=config, time_dict=time_dict
+                )
 
             # Update the timing dict
             t1 = time.monotonic()
@@ -1067,12 +1295,17 @@ class Linter:
             # than any generated during the fixing cycle.
             vs += initial_linting_errors
 
+            # We're done with the index now. If it was kept, then any
+            # violation would keep the whole tree (e.g. when linting a
+            # large file, where the trees are otherwise dropped).
+            tree.clear_type_index()
+
         # We process the ignore config here if appropriate
         if config:
             for violation in vs:
                 violation.ignore_if_in(config.get("ignore"))
 
-        linted_file = LintedFile(
+        return LintedFile(
             fname,
             vs,
             time_dict,
@@ -1081,6 +1314,11 @@ class Linter:
             templated_file=parsed.templated_file,
         )
 
+    def _dispatch_linted_file(
+        self, linted_file: LintedFile, fix: bool, config: FluffConfig
+    ) -> None:
+        """Report the results of linting a file to the formatter."""
+        fname = linted_file.path
         # This is the main command line output from linting.
         if self.formatter:
             self.formatter.dispatch_file_violations(
@@ -1094,6 +1332,118 @@ class Linter:
             if self.formatter:
                 self.formatter.dispatch_dialect_warning()
 
+    def can_process_by_statement(self, config: Optional[FluffConfig] = None) -> bool:
+        """Can files be processed one statement at a time?
+
+        Only files without templating can be, because a template can
+        span several statements. Nor can files in dialects where a
+        semicolon doesn't always end a statement.
+        """
+        config = config or self.config
+        return self.templater.name == "raw" and can_split_statements(
+            config.get("dialect_obj").get_lexer_struct()
+        )
+
+    def is_large_file(self, fname: str, config: Optional[FluffConfig] = None) -> bool:
+        """Should this file be processed one statement at a time?
+
+        Files of at least `large_file_threshold` bytes are, if they can
+        be (see `can_process_by_statement`).
+        """
+        threshold = (config or self.config).get("large_file_threshold")
+        return bool(
+            threshold
+            and self.can_process_by_statement(config)
+            and os.path.getsize(fname) >= threshold
+        )
+
+    def iter_statements(
+        self, buff, config: Optional[FluffConfig] = None
+    ) -> Iterator[Tuple[str, FilePositionMarker]]:
+        """Iterate through the statements in a buffer, with their positions.
+
+        The buffer is the bytes of a file (or an `mmap` of them). Several
+        statements may come together, if they can't be split (see
+        `iter_statement_chunks`).
+        """
+        lexer_struct = (config or self.config).get("dialect_obj").get_lexer_struct()
+        return self._decode_statements(iter_statement_chunks(buff, lexer_struct))
+
+    def iter_stream_statements(
+        self, stream, config: Optional[FluffConfig] = None
+    ) -> Iterator[Tuple[str, FilePositionMarker]]:
+        """Iterate through the statements in a binary stream (e.g. stdin).
+
+        As for `iter_statements`, but the stream is read as we go, so
+        that only the statement being read needs to be held in memory.
+        """
+        lexer_struct = (config or self.config).get("dialect_obj").get_lexer_struct()
+        return self._decode_statements(
+            iter_stream_statement_chunks(stream, lexer_struct)
+        )
+
+    @staticmethod
+    def _decode_statements(
+        chunks: Iterator[bytes],
+    ) -> Iterator[Tuple[str, FilePositionMarker]]:
+        start_pos = FilePositionMarker()
+        for chunk in chunks:
+            # Decode as we would when reading the file as text,
+            # including the translation of newlines.
+            statement = chunk.decode("utf8", errors="backslashreplace")
+            statement = statement.replace("\r\n", "\n").replace("\r", "\n")
+            yield statement, start_pos
+            start_pos = start_pos.advance_by(statement)
+
+    def iter_file_statements(
+        self, fname: str, config: Optional[FluffConfig] = None
+    ) -> Iterator[Tuple[str, FilePositionMarker]]:
+        """Iterate through the statements in a file, with their positions.
+
+        The file is memory-mapped rather than read, so that only one
+        statement at a time needs to be held in memory as a string.
+        """
+        with open(fname, "rb") as target_file:
+            # Empty files can't be mapped, but they've no statements anyway.
+            if not os.fstat(target_file.fileno()).st_size:
+                return
+            with mmap.mmap(target_file.fileno(), 0, access=mmap.ACCESS_READ) as buff:
+                yield from self.iter_statements(buff, config)
+
+    def lint_large_file(
+        self, fname: str, fix: bool = False, config: Optional[FluffConfig] = None
+    ) -> LintedFile:
+        """Lint a file one statement at a time, to keep memory use bounded.
+
+        The tree for each statement is discarded once it has been linted,
+        so the resulting `LintedFile` has no tree and can't be fixed.
+        """
+        config = config or self.config
+        if fix:
+            linter_logger.warning(
+                "Cannot fix %s because it is being linted one statement at a time.",
+                fname,
+            )
+        violations = []
+        ignore_mask = []
+        time_dict: Dict[str, float] = {}
+        for statement, start_pos in self.iter_file_statements(fname, config):
+            parsed = self.parse_string(
+                statement, fname=fname, config=config, start_pos=start_pos
+            )
+            linted_file = self.lint_parsed(parsed, fname=fname, config=config)
+            violations += linted_file.violations
+            ignore_mask += linted_file.ignore_mask
+            time_dict = LintingResult.sum_dicts(time_dict, linted_file.time_dict)
+        linted_file = LintedFile(
+            fname,
+            violations,
+            time_dict,
+            None,
+            ignore_mask=ignore_mask,
+            templated_file=None,
+        )
+        self._dispatch_linted_file(linted_file, fix=False, config=config)
         return linted_file
 
     def paths_from_path(
@@ -1233,6 +1583,9 @@ class Linter:
             ignore_files=ignore_files,
         ):
             config = self.config.make_child_from_path(fname)
+            if self.is_large_file(fname, config):
+                linted_path.add(self.lint_large_file(fname, fix=fix, config=config))
+                continue
             # Handle unicode issues gracefully
             with open(
                 fname, "r", encoding="utf8", errors="backslashreplace"
@@ -1267,35 +1620,63 @@ To hide this warning, add the failing file to .sqlfluffignore
             paths = (os.getcwd(),)
         # Set up the result to hold what we get back
         result = LintingResult()
-        for path in paths:
-            # Iterate through files recursively in the specified directory (if it's a directory)
-            # or read the file directly if it's not
-            result.add(
-                self.lint_path(
-                    path,
-                    fix=fix,
-                    ignore_non_existent_files=ignore_non_existent_files,
-                    ignore_files=ignore_files,
+        try:
+            for path in paths:
+                # Iterate through files recursively in the specified directory (if it's a directory)
+                # or read the file directly if it's not
+                result.add(
+                    self.lint_path(
+                        path,
+                        fix=fix,
+                        ignore_non_existent_files=ignore_non_existent_files,
+                        ignore_files=ignore_files,
+                    )
                 )
-            )
+        finally:
+            self.close_rule_pool()
         return result
 
     def parse_path(
-        self, path: str, recurse: bool = True
+        self,
+        path: str,
+        recurse: bool = True,
+        profiler: Optional[ParseProfiler] = None,
+        by_statement: bool = False,
     ) -> Generator[ParsedString, None, None]:
         """Parse a path of sql files.
 
         NB: This a generator which will yield the result of each file
-        within the path iteratively.
+        within the path iteratively. If a `profiler` is provided, the
+        timings for all the files accumulate within it. Large files
+        (see `is_large_file`) yield a result for each statement, as do
+        all files if `by_statement` is set and they can be processed
+        one statement at a time (see `can_process_by_statement`).
         """
         for fname in self.paths_from_path(path):
             if self.formatter:
                 self.formatter.dispatch_path(path)
             config = self.config.make_child_from_path(fname)
+            if (
+                by_statement and self.can_process_by_statement(config)
+            ) or self.is_large_file(fname, config):
+                for statement, start_pos in self.iter_file_statements(fname, config):
+                    yield self.parse_string(
+                        statement,
+                        fname=fname,
+                        recurse=recurse,
+                        config=config,
+                        profiler=profiler,
+                        start_pos=start_pos,
+                    )
+                continue
             # Handle unicode issues gracefully
             with open(
                 fname, "r", encoding="utf8", errors="backslashreplace"
             ) as target_file:
                 yield self.parse_string(
-                    target_file.read(), fname=fname, recurse=recurse, config=config
+                    target_file.read(),
+                    fname=fname,
+                    recurse=recurse,
+                    config=config,
+                    profiler=profiler,
                 )
@@ -28,4 +28,6 @@ from .grammar import (
 from .markers import FilePositionMarker
 from .lexer import Lexer
 from .parser import Parser
+from .profiler import ParseProfiler
+from .serialize import dump_tree, load_tree
 from .matchable import Matchable
@@ -26,10 +26,13 @@ class RootParseContext:
     which created it so that it can refer to config within it.
     """
 
-    def __init__(self, dialect, indentation_config=None, recurse=True):
+    def __init__(self, dialect, indentation_config=None, recurse=True, profiler=None):
         """Store persistent config objects."""
         self.dialect = dialect
         self.recurse = recurse
+        # An optional ParseProfiler, which if present records timings
+        # and counters for each grammar as we match.
+        self.profiler = profiler
         # Indentation config is used by Indent and Dedent and used to control
         # the intended indentation of certain features. Specifically it is
         # used in segments_common.Indent.when().
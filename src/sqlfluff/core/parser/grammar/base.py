@@ -702,7 +702,10 @@ class Ref(BaseGrammar):
         # objects.
         seg_tuple = (id(seg) for seg in segments)
         self_name = self._get_ref()
-        if parse_context.blacklist.check(self_name, seg_tuple):
+        in_blacklist = parse_context.blacklist.check(self_name, seg_tuple)
+        if parse_context.profiler:
+            parse_context.profiler.record_memo(hit=in_blacklist)
+        if in_blacklist:
             # This has been tried before.
             parse_match_logging(
                 self.__class__.__name__,
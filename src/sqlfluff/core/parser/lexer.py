@@ -1,5 +1,6 @@
 """The code for the Lexer."""
 
+import bisect
 import logging
 from typing import Optional, List, Tuple, Union
 from collections import namedtuple
@@ -47,6 +48,25 @@ class SingletonMatcher:
         self.target_seg_class = target_seg_class
         self.subdivide = subdivide
         self.trim_post_subdivide = trim_post_subdivide
+        # Compile the subdivision and trimming regexes and make their
+        # segment classes once here, rather than on every match.
+        if subdivide:
+            self._divider = re.compile(subdivide["regex"], re.DOTALL)
+            self._divider_class = RawSegment.make(
+                subdivide["regex"], name=subdivide["name"], type=subdivide["type"]
+            )
+        if trim_post_subdivide:
+            self._trimmer = re.compile(trim_post_subdivide["regex"], re.DOTALL)
+            self._trim_class = RawSegment.make(
+                trim_post_subdivide["regex"],
+                name=trim_post_subdivide["name"],
+                type=trim_post_subdivide["type"],
+            )
+
+    @property
+    def regex_template(self):
+        """The regex equivalent of this matcher, for combining with others."""
+        return re.escape(self.template)
 
     def _match(self, forward_string):
         """The private match function. Just look for a single character match."""
@@ -55,6 +75,13 @@ class SingletonMatcher:
         else:
             return None
 
+    def _match_at(self, string, pos):
+        """Match at an offset within a string, without slicing it."""
+        if string[pos] == self.template:
+            return string[pos]
+        else:
+            return None
+
     def _trim(self, matched, start_pos):
         """Given a string, trim if we are allowed to.
 
@@ -68,14 +95,9 @@ class SingletonMatcher:
         idx = 0
 
         if self.trim_post_subdivide:
-            trimmer = re.compile(self.trim_post_subdivide["regex"], re.DOTALL)
-            TrimClass = RawSegment.make(
-                self.trim_post_subdivide["regex"],
-                name=self.trim_post_subdivide["name"],
-                type=self.trim_post_subdivide["type"],
-            )
+            TrimClass = self._trim_class
 
-            for trim_mat in trimmer.finditer(matched):
+            for trim_mat in self._trimmer.finditer(matched):
                 trim_span = trim_mat.span()
                 # Is it at the start?
                 if trim_span[0] == 0:
@@ -126,16 +148,11 @@ class SingletonMatcher:
             seg_buff = ()
             str_buff = matched
             pos_buff = start_pos
-            divider = re.compile(self.subdivide["regex"], re.DOTALL)
-            DividerClass = RawSegment.make(
-                self.subdivide["regex"],
-                name=self.subdivide["name"],
-                type=self.subdivide["type"],
-            )
+            DividerClass = self._divider_class
 
             while True:
                 # Iterate through subdividing as appropriate
-                mat = divider.search(str_buff)
+                mat = self._divider.search(str_buff)
                 if mat:
                     # Found a division
                     span = mat.span()
@@ -214,6 +231,11 @@ class RegexMatcher(SingletonMatcher):
         flags = re.DOTALL
         self._compiled_regex = re.compile(self.template, flags)
 
+    @property
+    def regex_template(self):
+        """The regex equivalent of this matcher, for combining with others."""
+        return self.template
+
     def _match(self, forward_string):
         """Use regexes to match chunks."""
         match = self._compiled_regex.match(forward_string)
@@ -222,6 +244,14 @@ class RegexMatcher(SingletonMatcher):
         else:
             return None
 
+    def _match_at(self, string, pos):
+        """Use regexes to match chunks at an offset within a string."""
+        match = self._compiled_regex.match(string, pos)
+        if match:
+            return match.group(0)
+        else:
+            return None
+
 
 class RepeatedMultiMatcher(SingletonMatcher):
     """Uses other matchers in priority order.
@@ -231,32 +261,74 @@ class RepeatedMultiMatcher(SingletonMatcher):
             in turn. If none match a given forward looking string we simply
             return the unmatched part as per any other matcher.
 
+    For performance, the submatchers are compiled into a single regex
+    with one named group per submatcher. Alternation in python regexes
+    is ordered, so the first submatcher to match still wins. Matching
+    is done by offset into the string so that we never copy the
+    remainder of the string on each match.
     """
 
     def __init__(self, *submatchers):
         self.submatchers = submatchers
+        self._combined_regex = self._compile_combined(submatchers)
+
+    @staticmethod
+    def _compile_combined(submatchers):
+        """Compile the submatchers into one alternation regex.
+
+        Returns None if any of the submatchers can't be expressed
+        as a regex, in which case we try them each in turn.
+        """
+        templates = [getattr(m, "regex_template", None) for m in submatchers]
+        if not templates or any(t is None for t in templates):
+            return None
+        return re.compile(
+            "|".join(
+                "(?P<m{0}>{1})".format(idx, template)
+                for idx, template in enumerate(templates)
+            ),
+            re.DOTALL,
+        )
+
+    def _match_submatchers(self, string, pos):
+        """Find the first submatcher to match at an offset within a string.
+
+        Returns:
+            :obj:`tuple` of (matched string, matcher) or (None, None).
+
+        """
+        start_idx = 0
+        if self._combined_regex:
+            match = self._combined_regex.match(string, pos)
+            if not match:
+                return None, None
+            matcher_idx = int(match.lastgroup[1:])
+            if match.end() > pos:
+                return match.group(0), self.submatchers[matcher_idx]
+            # The first alternative to match did so with an empty string, which
+            # doesn't count as a match. Carry on with the ones after it.
+            start_idx = matcher_idx + 1
+        for matcher in self.submatchers[start_idx:]:
+            matched = matcher._match_at(string, pos)
+            if matched:
+                return matched, matcher
+        return None, None
 
     def match(self, forward_string, start_pos):
         """Iteratively match strings using the selection of submatchers."""
-        seg_buff = ()
-        while True:
-            if len(forward_string) == 0:
-                return LexMatch(forward_string, start_pos, seg_buff)
-            for matcher in self.submatchers:
-                res = matcher.match(forward_string, start_pos)
-                if res.segments:
-                    # If we have new segments then whoop!
-                    seg_buff += res.segments
-                    forward_string = res.new_string
-                    start_pos = res.new_pos
-                    # Cycle back around again and start with the top
-                    # matcher again.
-                    break
-                else:
-                    continue
-            else:
-                # We've got so far, but now can't match. Return
-                return LexMatch(forward_string, start_pos, seg_buff)
+        seg_buff = []
+        pos = 0
+        str_len = len(forward_string)
+        while pos < str_len:
+            matched, matcher = self._match_submatchers(forward_string, pos)
+            if not matched:
+                # We've got so far, but now can't match.
+                break
+            new_segments = matcher._subdivide(matched, start_pos)
+            seg_buff.extend(new_segments)
+            start_pos = new_segments[-1].get_end_pos_marker()
+            pos += len(matched)
+        return LexMatch(forward_string[pos:], start_pos, tuple(seg_buff))
 
     @classmethod
     def from_struct(cls, s):
@@ -309,7 +381,7 @@ class Lexer:
         package it up as unlexable and keep track of the exceptions.
         """
         start_pos = FilePositionMarker()
-        segment_buff = ()
+        segment_buff: List[BaseSegment] = []
         violations = []
 
         # Handle potential TemplatedFile for now
@@ -317,7 +389,7 @@ class Lexer:
 
         while True:
             res = self.matcher.match(str_buff, start_pos)
-            segment_buff += res.segments
+            segment_buff.extend(res.segments)
             if len(res.new_string) > 0:
                 violations.append(
                     SQLLexError(
@@ -334,15 +406,15 @@ class Lexer:
 
                 str_buff = resort_res.new_string
                 start_pos = resort_res.new_pos
-                segment_buff += resort_res.segments
+                segment_buff.extend(resort_res.segments)
             else:
                 break
 
         # Enrich the segments if we can using the templated file
         if isinstance(raw, TemplatedFile):
-            return self.enrich_segments(segment_buff, raw), violations
+            return self.enrich_segments(tuple(segment_buff), raw), violations
         else:
-            return segment_buff, violations
+            return tuple(segment_buff), violations
 
     @staticmethod
     def enrich_segments(
@@ -359,6 +431,8 @@ class Lexer:
         new_segment_buff = []
         # Get the templated slices to re-insert tokens for them
         source_only_slices = templated_file.source_only_slices()
+        # These are sorted, so keep a list of their positions to bisect.
+        source_only_idxs = [elem.source_idx for elem in source_only_slices]
 
         lexer_logger.info(
             "Enriching Segments. Source-only slices: %s", source_only_slices
@@ -377,7 +451,10 @@ class Lexer:
             # so we should consider whether we've captured any. If we have then
             # we need to re-evaluate whether it's a literal or not.
 
-            for source_only_slice in source_only_slices:
+            # Jump straight to the first source-only slice at this position.
+            so_idx = bisect.bisect_left(source_only_idxs, source_slice.start)
+            for idx in range(so_idx, len(source_only_slices)):
+                source_only_slice = source_only_slices[idx]
                 if source_only_slice.source_idx > source_slice.start:
                     break
                 elif source_only_slice.source_idx == source_slice.start:
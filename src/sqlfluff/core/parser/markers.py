@@ -9,7 +9,7 @@ from typing import Optional
 class FilePositionMarker:
     """This class is a construct to keep track of positions within a file."""
 
-    slots = ["statement_index", "line_no", "line_pos", "char_pos"]
+    __slots__ = ["statement_index", "line_no", "line_pos", "char_pos"]
 
     def __init__(
         self,
@@ -65,15 +65,38 @@ class FilePositionMarker:
         line = self.line_no
         pos = self.line_pos
         char_pos = self.char_pos
-        for elem in raw:
-            char_pos += 1
-            if elem == "\n":
-                line += 1
-                pos = 1
+        if raw:
+            # Count newlines using str methods rather than iterating
+            # through the string, because this is called for every
+            # segment in the file.
+            char_pos += len(raw)
+            newlines = raw.count("\n")
+            if newlines:
+                line += newlines
+                # The position is one plus the number of characters
+                # after the last newline.
+                pos = len(raw) - raw.rfind("\n")
             else:
-                pos += 1
+                pos += len(raw)
         return FilePositionMarker(stmt + idx, line, pos, char_pos)
 
+    def offset_by(self, start_pos):
+        """Construct a marker for this point, if the file started at `start_pos`.
+
+        This is used when a file is processed in pieces, to make the
+        positions of each piece relative to the whole file.
+        """
+        line_pos = self.line_pos
+        # Only the first line of the piece is offset horizontally.
+        if self.line_no == 1 and line_pos is not None:
+            line_pos += start_pos.line_pos - 1
+        return FilePositionMarker(
+            self.statement_index,
+            self.line_no + start_pos.line_no - 1,
+            line_pos,
+            self.char_pos + start_pos.char_pos,
+        )
+
     def shift_to(self, other):
         """Shift the position of this marker to that of other.
 
@@ -98,7 +121,7 @@ class FilePositionMarker:
 class EnrichedFilePositionMarker(FilePositionMarker):
     """A more advanced file position marker which keeps track of source position."""
 
-    slots = ["templated_slice", "source_slice", "is_literal", "source_pos_marker"]
+    __slots__ = ["templated_slice", "source_slice", "is_literal", "source_pos_marker"]
 
     def __init__(
         self,
@@ -141,6 +164,28 @@ class EnrichedFilePositionMarker(FilePositionMarker):
             source_pos_marker=self.source_pos_marker,
         )
 
+    def offset_by(self, start_pos):
+        """Construct a marker for this point, if the file started at `start_pos`.
+
+        Both the templated and source positions are offset.
+        """
+        base = super().offset_by(start_pos)
+        offset = start_pos.char_pos
+        return EnrichedFilePositionMarker(
+            statement_index=base.statement_index,
+            line_no=base.line_no,
+            line_pos=base.line_pos,
+            char_pos=base.char_pos,
+            templated_slice=slice(
+                self.templated_slice.start + offset, self.templated_slice.stop + offset
+            ),
+            source_slice=slice(
+                self.source_slice.start + offset, self.source_slice.stop + offset
+            ),
+            is_literal=self.is_literal,
+            source_pos_marker=self.source_pos_marker.offset_by(start_pos),
+        )
+
     def combine(self, *others):
         """Work out a new position marker from that of the parent segments.
 
@@ -45,15 +45,24 @@ def match_wrapper(v_level=3):
 
         def wrapped_match_method(self_cls, segments: tuple, parse_context):
             """A wrapper on the match function to do some basic validation."""
-            # Use the ephemeral_segment if present. This should only
-            # be the case for grammars where `ephemeral_name` is defined.
-            ephemeral_segment = getattr(self_cls, "ephemeral_segment", None)
-            if ephemeral_segment:
-                # We're going to return as though it's a full match, similar to Anything().
-                m = MatchResult.from_matched(ephemeral_segment(segments=segments))
-            else:
-                # Otherwise carry on through with wrapping the function.
-                m = func(self_cls, segments, parse_context=parse_context)
+            # If we're profiling, time the match.
+            profiler = parse_context.profiler
+            if profiler:
+                profiler.start(self_cls)
+            m = None
+            try:
+                # Use the ephemeral_segment if present. This should only
+                # be the case for grammars where `ephemeral_name` is defined.
+                ephemeral_segment = getattr(self_cls, "ephemeral_segment", None)
+                if ephemeral_segment:
+                    # We're going to return as though it's a full match, similar to Anything().
+                    m = MatchResult.from_matched(ephemeral_segment(segments=segments))
+                else:
+                    # Otherwise carry on through with wrapping the function.
+                    m = func(self_cls, segments, parse_context=parse_context)
+            finally:
+                if profiler:
+                    profiler.stop(segments, m)
 
             # Validate result
             if not isinstance(m, MatchResult):
@@ -7,6 +7,7 @@ from ..config import FluffConfig
 
 if TYPE_CHECKING:
     from .segments import BaseSegment
+    from .profiler import ParseProfiler
 
 
 class Parser:
@@ -19,13 +20,24 @@ class Parser:
         self.config = FluffConfig.from_kwargs(config=config, dialect=dialect)
         self.RootSegment = self.config.get("dialect_obj").get_root_segment()
 
-    def parse(self, segments: Tuple["BaseSegment", ...], recurse=True) -> "BaseSegment":
-        """Parse a series of lexed tokens using the current dialect."""
+    def parse(
+        self,
+        segments: Tuple["BaseSegment", ...],
+        recurse=True,
+        profiler: Optional["ParseProfiler"] = None,
+    ) -> "BaseSegment":
+        """Parse a series of lexed tokens using the current dialect.
+
+        If a `ParseProfiler` is provided, then timings for each
+        grammar will be recorded in it as we go.
+        """
         if not segments:
             raise ValueError("Cannot parse an empty iterable of segments.")
         # Instantiate the root segment
         root_segment = self.RootSegment(segments=segments)
         # Call .parse() on that segment
-        with RootParseContext.from_config(config=self.config, recurse=recurse) as ctx:
+        with RootParseContext.from_config(
+            config=self.config, recurse=recurse, profiler=profiler
+        ) as ctx:
             parsed = root_segment.parse(parse_context=ctx)
         return parsed
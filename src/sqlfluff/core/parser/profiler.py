@@ -0,0 +1,161 @@
+"""Defines the ParseProfiler, which records timings for grammars while parsing.
+
+The profiler is optional, and is attached to the `RootParseContext`. When
+present, the `match_wrapper` reports the start and end of every match
+call to it, so that the profile can be broken down by the name of the
+grammar or segment which was matching rather than by python function
+(which is all that `cProfile` can do).
+"""
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+def profile_key(matcher) -> Tuple[str, str]:
+    """Work out the (kind, name) which a matcher should be profiled under.
+
+    Segments match as *classes*, so we use the class name. References
+    are more useful by the name of the thing they reference, and any
+    other grammar is profiled by the name of its class.
+    """
+    if isinstance(matcher, type):
+        return "segment", matcher.__name__
+    # Ref grammars are identified by the name they refer to.
+    get_ref = getattr(matcher, "_get_ref", None)
+    if get_ref:
+        return "ref", get_ref()
+    return "grammar", matcher.__class__.__name__
+
+
+class ProfileRecord:
+    """The accumulated statistics for a single grammar or segment."""
+
+    __slots__ = [
+        "kind",
+        "name",
+        "calls",
+        "cumulative_time",
+        "self_time",
+        "memo_hits",
+        "memo_misses",
+        "tokens_attempted",
+        "tokens_matched",
+        "_active",
+    ]
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.calls = 0
+        self.cumulative_time = 0.0
+        self.self_time = 0.0
+        self.memo_hits = 0
+        self.memo_misses = 0
+        self.tokens_attempted = 0
+        self.tokens_matched = 0
+        # How many calls for this record are currently on the stack.
+        # This stops recursive calls double counting cumulative time.
+        self._active = 0
+
+    def __repr__(self):
+        return "<ProfileRecord: {0}:{1} calls={2} self={3:.4f}>".format(
+            self.kind, self.name, self.calls, self.self_time
+        )
+
+    def as_dict(self) -> dict:
+        """Return the record as a dict, for serialization to json."""
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "calls": self.calls,
+            "cumulative_time": self.cumulative_time,
+            "self_time": self.self_time,
+            "memo_hits": self.memo_hits,
+            "memo_misses": self.memo_misses,
+            "tokens_attempted": self.tokens_attempted,
+            "tokens_matched": self.tokens_matched,
+        }
+
+
+class ParseProfiler:
+    """Collects timings and counters for each grammar during parsing.
+
+    A single profiler can be shared between several parse operations
+    (e.g. for all the files in a path), in which case the results
+    accumulate.
+    """
+
+    # The fields which records can be ranked by.
+    sort_keys = (
+        "self_time",
+        "cumulative_time",
+        "calls",
+        "memo_hits",
+        "memo_misses",
+        "tokens_attempted",
+        "tokens_matched",
+    )
+
+    def __init__(self):
+        self._records: Dict[Tuple[str, str], ProfileRecord] = {}
+        # Each element of the stack is a list of [record, start_time, child_time].
+        self._stack: List[list] = []
+
+    def start(self, matcher):
+        """Record the start of a match call."""
+        key = profile_key(matcher)
+        record = self._records.get(key)
+        if record is None:
+            record = self._records[key] = ProfileRecord(*key)
+        record.calls += 1
+        record._active += 1
+        self._stack.append([record, time.perf_counter(), 0.0])
+
+    def stop(self, segments: tuple, match=None):
+        """Record the end of the most recent match call.
+
+        `match` may be None if the match raised an exception, in which
+        case we still unwind the stack, but count nothing as matched.
+        """
+        record, start_time, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - start_time
+        record.self_time += elapsed - child_time
+        record._active -= 1
+        # Only the outermost of any recursive calls counts to the cumulative.
+        if not record._active:
+            record.cumulative_time += elapsed
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        record.tokens_attempted += len(segments)
+        if match:
+            record.tokens_matched += len(match)
+
+    def record_memo(self, hit: bool):
+        """Record a memo (blacklist) lookup against the current match call."""
+        if not self._stack:
+            return
+        record = self._stack[-1][0]
+        if hit:
+            record.memo_hits += 1
+        else:
+            record.memo_misses += 1
+
+    def records(
+        self, sort_by: str = "self_time", limit: Optional[int] = None
+    ) -> List[ProfileRecord]:
+        """Return the profile records ranked by the given field, largest first."""
+        if sort_by not in self.sort_keys:
+            raise ValueError(
+                "Cannot sort profile by {0!r}. Expected one of {1!r}".format(
+                    sort_by, self.sort_keys
+                )
+            )
+        ranked = sorted(
+            self._records.values(),
+            key=lambda r: (-getattr(r, sort_by), r.kind, r.name),
+        )
+        return ranked[:limit] if limit else ranked
+
+    def as_records(self, sort_by: str = "self_time", limit: Optional[int] = None):
+        """Return the ranked profile as a list of dicts."""
+        return [r.as_dict() for r in self.records(sort_by=sort_by, limit=limit)]
@@ -8,10 +8,10 @@ Here we define:
   analysis.
 """
 
+from bisect import bisect_left
 from io import StringIO
 import copy
 from benchit import BenchIt
-from cached_property import cached_property
 from typing import Optional, List, Tuple, NamedTuple, Iterator
 import logging
 
@@ -46,6 +46,40 @@ class FixPatch(NamedTuple):
     patch_type: str
 
 
+class SegmentTypeIndex:
+    """An index of the segments of each type within a tree.
+
+    Built by `BaseSegment.index_types`. Each segment in the tree
+    holds a reference to this, along with the range of `segments`
+    which makes up its subtree, so that `recursive_crawl` and
+    `path_to` can answer from here rather than walking the tree.
+
+    NB: Because of this, keeping any one segment of an indexed tree
+    keeps the whole tree. Once the tree isn't needed any more, clear
+    the index with `BaseSegment.clear_type_index`.
+    """
+
+    __slots__ = ["positions", "segments", "parents", "lookup"]
+
+    def __init__(self):
+        # A list of all the segments, in document (pre-)order.
+        self.segments = []
+        # A dict of type -> sorted list of positions in `segments`.
+        self.positions = {}
+        # The position of the parent of each segment (None for the root).
+        self.parents = []
+        # A dict of id(segment) -> position in `segments`.
+        self.lookup = {}
+
+    def __deepcopy__(self, memo):
+        """Don't copy the index along with a segment.
+
+        The index refers to the original segments, so isn't valid for
+        the copy, which instead falls back to walking its subtree.
+        """
+        return None
+
+
 class BaseSegment:
     """The base segment element.
 
@@ -64,6 +98,34 @@ class BaseSegment:
     purpose as a matcher.
     """
 
+    # There are a lot of segments, so we use slots to keep them small.
+    # Subclasses which don't define their own `__slots__` will still get a
+    # `__dict__`, but we do so for the raw segments which make up most of
+    # any parse tree. The `_cache_*` slots hold the values of the cached
+    # properties below, and are cleared by `invalidate_caches`.
+    # NB: `segments` isn't slotted, because raw segments define it as a
+    # property. Segments with children hold it in their `__dict__`.
+    __slots__ = [
+        "pos_marker",
+        "_is_expandable",
+        "_cache_is_code",
+        "_cache_is_comment",
+        "_cache_raw",
+        "_cache_raw_upper",
+        "_cache_matched_length",
+        "_cache_type_index",
+    ]
+    # The caches which only depend on the content of the segment, and
+    # so are still valid for a copy of it in a different position.
+    _content_cache_slots = (
+        "_cache_is_code",
+        "_cache_is_comment",
+        "_cache_raw",
+        "_cache_raw_upper",
+        "_cache_matched_length",
+    )
+    _cache_slots = _content_cache_slots + ("_cache_type_index",)
+
     # `type` should be the *category* of this kind of segment
     type = "base"
     parse_grammar: Optional[Matchable] = None
@@ -82,8 +144,22 @@ class BaseSegment:
     # What should we trim off the ends to get to content
     trim_chars = None
     trim_start = None
-    # A cache variable for expandable
-    _is_expandable = None
+    # The full set of types of this class and its parents. This
+    # is set for each subclass in `__init_subclass__`.
+    _class_types = frozenset(["base"])
+
+    def __init_subclass__(cls, **kwargs):
+        """Precompute the set of types this class is, for `is_type`.
+
+        This also runs for the classes generated by `make()`.
+        """
+        super().__init_subclass__(**kwargs)
+        types = {cls.type}
+        # Stop at the bottom, as `is_type` used to.
+        if cls.type != "base":
+            for base_class in cls.__bases__:
+                types.update(getattr(base_class, "_class_types", ()))
+        cls._class_types = frozenset(types)
 
     def __init__(self, segments, pos_marker=None, validate=True):
         if len(segments) == 0:
@@ -183,8 +259,8 @@ class BaseSegment:
         Once a segment is *not* expandable, it can never become so, which is
         why the variable is cached.
         """
-        if self._is_expandable is False:
-            return self._is_expandable
+        if getattr(self, "_is_expandable", None) is False:
+            return False
         elif self.parse_grammar:
             return True
         elif self.segments and any(s.is_expandable for s in self.segments):
@@ -194,30 +270,52 @@ class BaseSegment:
             self._is_expandable = False
             return False
 
-    @cached_property
+    @property
     def is_code(self):
         """Return True if this segment contains any code."""
-        return any(seg.is_code for seg in self.segments)
+        try:
+            return self._cache_is_code
+        except AttributeError:
+            self._cache_is_code = any(seg.is_code for seg in self.segments)
+            return self._cache_is_code
 
-    @cached_property
+    @property
     def is_comment(self):
         """Return True if this is entirely made of comments."""
-        return all(seg.is_comment for seg in self.segments)
+        try:
+            return self._cache_is_comment
+        except AttributeError:
+            self._cache_is_comment = all(seg.is_comment for seg in self.segments)
+            return self._cache_is_comment
 
-    @cached_property
+    @property
     def raw(self):
         """Make a string from the segments of this segment."""
-        return self._reconstruct()
+        try:
+            return self._cache_raw
+        except AttributeError:
+            self._cache_raw = self._reconstruct()
+            return self._cache_raw
 
-    @cached_property
+    @property
     def raw_upper(self):
         """Make an uppercase string from the segments of this segment."""
-        return self._reconstruct().upper()
+        try:
+            return self._cache_raw_upper
+        except AttributeError:
+            self._cache_raw_upper = self.raw.upper()
+            return self._cache_raw_upper
 
-    @cached_property
+    @property
     def matched_length(self):
         """Return the length of the segment in characters."""
-        return sum(seg.matched_length for seg in self.segments)
+        try:
+            return self._cache_matched_length
+        except AttributeError:
+            self._cache_matched_length = sum(
+                seg.matched_length for seg in self.segments
+            )
+            return self._cache_matched_length
 
     # ################ STATIC METHODS
 
@@ -353,15 +451,7 @@ class BaseSegment:
     @classmethod
     def is_type(cls, *seg_type):
         """Is this segment (or its parent) of the given type."""
-        # Do we match on the type of _this_ class.
-        if cls.type in seg_type:
-            return True
-        # Have we reached the bottom?
-        elif cls.type == "base":
-            return False
-        # If not, check parent classes.
-        else:
-            return any(base_class.is_type(*seg_type) for base_class in cls.__bases__)
+        return not cls._class_types.isdisjoint(seg_type)
 
     @classmethod
     def structural_simplify(cls, elem):
@@ -478,10 +568,15 @@ class BaseSegment:
         """Invalidate the cached properties.
 
         This should be called whenever the segments within this
-        segment is mutated.
+        segment is mutated. NB: That includes any type index, but only
+        for this segment, so rebuild the index from the root of the tree
+        with `index_types` after any mutation.
         """
-        for key in ["is_code", "is_comment", "raw", "raw_upper", "matched_length"]:
-            self.__dict__.pop(key, None)
+        for key in self._cache_slots:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                pass
 
     def validate_segments(self, text="constructing", validate=True):
         """Validate the current set of segments.
@@ -608,6 +703,59 @@ class BaseSegment:
         """
         return self.structural_simplify(self.to_tuple(**kwargs))
 
+    def iter_record_events(self, code_only=False, show_raw=False):
+        """Iterate through the structure of `as_record` as a stream of events.
+
+        This lets us serialize big trees without building the whole
+        record in memory first. The events are tuples of `(kind, value)`
+        where kind is one of `map_start`, `map_end`, `seq_start`, `seq_end`
+        or `scalar`. Within a map, the scalars alternate between keys and
+        values, and value is None except for scalars.
+
+        Args:
+            code_only (:obj:`bool`): As for `to_tuple`.
+            show_raw (:obj:`bool`): As for `to_tuple`.
+
+        """
+        yield ("map_start", None)
+        yield ("scalar", self.type)
+        # Work through a stack of events still to yield, and segments
+        # still to expand, in reverse order. This avoids recursion.
+        stack = [("map_end", None), ("segment", self)]
+        while stack:
+            kind, elem = stack.pop()
+            if kind != "segment":
+                yield (kind, elem)
+                continue
+            if not elem.segments:
+                if show_raw:
+                    yield ("scalar", elem.raw)
+                else:
+                    yield ("seq_start", None)
+                    yield ("seq_end", None)
+                continue
+            children = [
+                seg
+                for seg in elem.segments
+                if not seg.is_meta and (seg.is_code or not code_only)
+            ]
+            if len({seg.type for seg in children}) == len(children) and children:
+                # No duplicate types, so this is a mapping of type to child.
+                yield ("map_start", None)
+                stack.append(("map_end", None))
+                for seg in reversed(children):
+                    stack.append(("segment", seg))
+                    stack.append(("scalar", seg.type))
+            else:
+                # Duplicate types, so this has to be a list of mappings.
+                yield ("seq_start", None)
+                stack.append(("seq_end", None))
+                for seg in reversed(children):
+                    stack.append(("map_end", None))
+                    stack.append(("segment", seg))
+                    stack.append(("scalar", seg.type))
+                    stack.append(("map_start", None))
+
     def raw_list(self):
         """Return a list of raw elements, mostly for testing or searching."""
         buff = []
@@ -651,6 +799,55 @@ class BaseSegment:
                 buff.append(seg)
         return buff
 
+    def index_types(self):
+        """Index the types of all the segments within this segment.
+
+        Once built, `recursive_crawl` on this segment (or any segment
+        within it) is answered from the index rather than by walking
+        the whole subtree. Fixes return new segments which don't carry
+        the index, so it never goes stale, but rebuild it on the new
+        tree to keep the benefit.
+        """
+        index = SegmentTypeIndex()
+        # Walk the tree in pre-order, without recursion. The second
+        # element of each tuple is the position of the parent on the
+        # way in, and the start position of the subtree on the way out.
+        stack = [(self, None, True)]
+        while stack:
+            seg, pos, entering = stack.pop()
+            if entering:
+                start = len(index.segments)
+                index.segments.append(seg)
+                index.parents.append(pos)
+                index.lookup[id(seg)] = start
+                for seg_type in seg._class_types:
+                    index.positions.setdefault(seg_type, []).append(start)
+                stack.append((seg, start, False))
+                stack.extend((child, start, True) for child in reversed(seg.segments))
+            else:
+                seg._cache_type_index = (index, pos, len(index.segments))
+        return index
+
+    def clear_type_index(self):
+        """Clear the type index of the tree which this segment is in.
+
+        This unlinks every segment in the tree from the index (and so
+        from each other), so that a segment which is kept after we're
+        done with the tree (e.g. for a violation) doesn't keep the rest
+        of the tree with it.
+        """
+        type_index = getattr(self, "_cache_type_index", None)
+        if not type_index or not type_index[0]:
+            return
+        index = type_index[0]
+        for seg in index.segments:
+            seg._cache_type_index = None
+        # The index may still be referred to elsewhere, so empty it too.
+        index.segments = []
+        index.positions = {}
+        index.parents = []
+        index.lookup = {}
+
     def recursive_crawl(self, *seg_type):
         """Recursively crawl for segments of a given type.
 
@@ -658,6 +855,10 @@ class BaseSegment:
             seg_type: :obj:`str`: one or more type of segment
                 to look for.
         """
+        type_index = getattr(self, "_cache_type_index", None)
+        if type_index and type_index[0]:
+            yield from self._crawl_type_index(type_index, seg_type)
+            return
         # Check this segment
         if self.is_type(*seg_type):
             yield self
@@ -665,6 +866,45 @@ class BaseSegment:
         for seg in self.segments:
             yield from seg.recursive_crawl(*seg_type)
 
+    def _crawl_type_index(self, type_index, seg_type):
+        """Find segments of the given types from a type index."""
+        index, start, stop = type_index
+        found = []
+        for elem in seg_type:
+            positions = index.positions.get(elem, ())
+            found += positions[
+                bisect_left(positions, start) : bisect_left(positions, stop)
+            ]
+        if len(seg_type) > 1:
+            # A segment might be more than one of the types.
+            found = sorted(set(found))
+        for pos in found:
+            # NB: This segment may be a (shallow) copy of the indexed one.
+            yield self if pos == start else index.segments[pos]
+
+    def _indexed_path_to(self, other):
+        """Find the path to a segment from a type index, if we have one.
+
+        Returns:
+            :obj:`list` of segments as for `path_to`, or None if this
+            segment isn't indexed or `other` isn't indexed within it.
+
+        """
+        type_index = getattr(self, "_cache_type_index", None)
+        if not type_index or not type_index[0]:
+            return None
+        index, start, stop = type_index
+        pos = index.lookup.get(id(other))
+        if pos is None or not start <= pos < stop:
+            return None
+        path = []
+        while pos != start:
+            path.append(index.segments[pos])
+            pos = index.parents[pos]
+        path.append(self)
+        path.reverse()
+        return path
+
     def path_to(self, other):
         """Given a segment which is assumed within self, get the intermediate segments.
 
@@ -677,6 +917,11 @@ class BaseSegment:
         if self is other:
             return [self]
 
+        # If the tree is indexed, we can just follow the parents.
+        path = self._indexed_path_to(other)
+        if path:
+            return path
+
         # Are we in the right ballpark?
         if (
             not self.get_start_pos_marker()
@@ -830,78 +1075,108 @@ class BaseSegment:
         so this function should just return self.
         """
         if fixes and not self.is_raw():
-            # Get a reference to self to start with, but this will rapidly
-            # become a working copy.
-            r = self
-
-            # Make a working copy
-            seg_buffer = []
-            todo_buffer = list(self.segments)
-            while True:
-                if len(todo_buffer) == 0:
+            # If this tree is indexed, work out which segments contain the
+            # anchors of the fixes. Then we only need to descend into (and
+            # rebuild) those. If any anchor isn't in the index, we don't
+            # know where it is, so descend into everything.
+            containing = set()
+            for f in fixes:
+                path = self._indexed_path_to(f.anchor)
+                if not path:
+                    containing = None
                     break
-                else:
-                    seg = todo_buffer.pop(0)
-
-                    fix_buff = fixes.copy()
-                    unused_fixes = []
-                    while fix_buff:
-                        f = fix_buff.pop()
-                        if f.anchor == seg:
-                            linter_logger.debug(
-                                "Matched fix against segment: %s -> %s", f, seg
-                            )
-                            if f.edit_type == "delete":
-                                # We're just getting rid of this segment.
-                                seg = None
-                            elif f.edit_type in ("edit", "create"):
-                                # We're doing a replacement (it could be a single segment or an iterable)
-                                if isinstance(f.edit, BaseSegment):
-                                    seg_buffer.append(f.edit)
-                                else:
-                                    for s in f.edit:
-                                        seg_buffer.append(s)
-
-                                if f.edit_type == "create":
-                                    # in the case of a creation, also add this segment on the end
-                                    seg_buffer.append(seg)
-                            else:
-                                raise ValueError(
-                                    "Unexpected edit_type: {0!r} in {1!r}".format(
-                                        f.edit_type, f
-                                    )
-                                )
-                            # We've applied a fix here. Move on, this also consumes the fix
-                            # TODO: Maybe deal with overlapping fixes later.
-                            break
-                        else:
-                            # We've not used the fix so we should keep it in the list for later.
-                            unused_fixes.append(f)
-                    else:
-                        seg_buffer.append(seg)
-                # Switch over the the unused list
-                fixes = unused_fixes + fix_buff
-                # Invalidate any caches
-                self.invalidate_caches()
-
-            # Then recurse (i.e. deal with the children) (Requeueing)
-            seg_queue = seg_buffer
-            seg_buffer = []
-            for seg in seg_queue:
-                s, fixes = seg.apply_fixes(fixes)
-                seg_buffer.append(s)
-
-            # Reform into a new segment
-            r = r.__class__(
-                segments=tuple(seg_buffer), pos_marker=r.pos_marker, validate=False
-            )
-
+                containing.update(id(seg) for seg in path)
+            r, fixes = self._apply_fixes(fixes, containing)
             # Lastly, before returning, we should realign positions.
-            # Note: Realign also returns a copy
+            # Note: Realign also returns a copy, and is recursive so we
+            # only need to do it once here rather than at every level.
             return r.realign(), fixes
         else:
             return self, fixes
 
+    @staticmethod
+    def _fix_key(segment):
+        """A key for matching fix anchors, consistent with segment equality."""
+        pos_marker = segment.pos_marker
+        return (
+            segment.__class__.__name__,
+            pos_marker.char_pos if pos_marker is not None else None,
+        )
+
+    def _apply_fixes(self, fixes, containing=None):
+        """Apply fixes to the children of this segment, without realigning.
+
+        Args:
+            fixes: The list of fixes to apply.
+            containing: A set of the ids of segments which contain anchors
+                of the fixes, or None to descend into all children.
+
+        """
+        # Index the fixes by anchor, so that we only compare each child
+        # against the fixes which could be anchored on it.
+        fix_index = {}
+        for f in fixes:
+            # Fixes without an anchor can't match anything, so are left
+            # unused (as they would be by comparing them with each child).
+            if f.anchor is None:
+                continue
+            fix_index.setdefault(self._fix_key(f.anchor), []).append(f)
+        used_fixes = set()
+
+        seg_buffer = []
+        for seg in self.segments:
+            # If there's more than one candidate, we take the last one.
+            for f in reversed(fix_index.get(self._fix_key(seg), ())):
+                if id(f) in used_fixes or f.anchor != seg:
+                    continue
+                linter_logger.debug("Matched fix against segment: %s -> %s", f, seg)
+                if f.edit_type == "delete":
+                    # We're just getting rid of this segment.
+                    pass
+                elif f.edit_type in ("edit", "create"):
+                    # We're doing a replacement (it could be a single segment or an iterable)
+                    if isinstance(f.edit, BaseSegment):
+                        seg_buffer.append(f.edit)
+                    else:
+                        for s in f.edit:
+                            seg_buffer.append(s)
+
+                    if f.edit_type == "create":
+                        # in the case of a creation, also add this segment on the end
+                        seg_buffer.append(seg)
+                else:
+                    raise ValueError(
+                        "Unexpected edit_type: {0!r} in {1!r}".format(f.edit_type, f)
+                    )
+                # We've applied a fix here. Move on, this also consumes the fix
+                # TODO: Maybe deal with overlapping fixes later.
+                used_fixes.add(id(f))
+                break
+            else:
+                seg_buffer.append(seg)
+        if used_fixes:
+            fixes = [f for f in fixes if id(f) not in used_fixes]
+
+        # Then recurse (i.e. deal with the children) (Requeueing)
+        seg_queue = seg_buffer
+        seg_buffer = []
+        for seg in seg_queue:
+            if (
+                fixes
+                and not seg.is_raw()
+                and (containing is None or id(seg) in containing)
+            ):
+                seg, fixes = seg._apply_fixes(fixes, containing)
+            seg_buffer.append(seg)
+
+        # Reform into a new segment
+        return (
+            self.__class__(
+                segments=tuple(seg_buffer), pos_marker=self.pos_marker, validate=False
+            ),
+            fixes,
+        )
+
     def realign(self):
         """Realign the positions in this segment.
 
@@ -918,10 +1193,19 @@ class BaseSegment:
 
         """
         # Create a new version of this class with the new details
-        return self.__class__(
+        new_seg = self.__class__(
             segments=self._realign_segments(self.segments, self.pos_marker),
             pos_marker=self.pos_marker,
         )
+        # Realigning doesn't change the content, so carry over any cached
+        # raw etc. This means that after a fix, only the segments which were
+        # actually edited need to rebuild their raw.
+        for key in self._content_cache_slots:
+            try:
+                setattr(new_seg, key, getattr(self, key))
+            except AttributeError:
+                pass
+        return new_seg
 
     def iter_patches(self, templated_str: str) -> Iterator[FixPatch]:
         """Iterate through the segments generating fix patches.
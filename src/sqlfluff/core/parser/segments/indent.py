@@ -9,6 +9,8 @@ from .raw import RawSegment
 class MetaSegment(RawSegment):
     """A segment which is empty but indicates where something should be."""
 
+    __slots__ = ()
+
     type = "meta"
     _is_code = False
     _template = "<unset>"
@@ -34,7 +36,7 @@ class MetaSegment(RawSegment):
                 )
             )
         # Sorcery (but less to than on _ProtoKeywordSegment)
-        return type(cls.__name__, (cls,), dict(_config_rules=kwargs))
+        return type(cls.__name__, (cls,), dict(__slots__=(), _config_rules=kwargs))
 
     @classmethod
     def is_enabled(cls, indent_config):
@@ -85,6 +87,7 @@ class MetaSegment(RawSegment):
         with repairs.
         """
         self._raw = ""
+        self._raw_upper = ""
         # We strip the position marker, so that when fixing it's
         # skipped and not considered. If no position marker is given
         # then give it a fresh one - it will need to be realigned
@@ -105,6 +108,8 @@ class Indent(MetaSegment):
     be compared later.
     """
 
+    __slots__ = ()
+
     type = "indent"
     indent_val = 1
 
@@ -120,6 +125,8 @@ class Dedent(Indent):
 
     """
 
+    __slots__ = ()
+
     type = "dedent"
     indent_val = -1
 
@@ -138,6 +145,8 @@ class TemplateSegment(MetaSegment):
     case rules want to lint this down the line.
     """
 
+    __slots__ = ["source_str", "block_type"]
+
     type = "placeholder"
 
     def __init__(self, pos_marker=None, source_str="", block_type=""):
@@ -36,6 +36,8 @@ class _ProtoKeywordSegment(RawSegment):
     may depend on later.
     """
 
+    __slots__ = ()
+
     type = "_proto_keyword"
     _is_code = True
     _template = "<unset>"
@@ -64,12 +66,9 @@ class _ProtoKeywordSegment(RawSegment):
 
         # We're only going to match against the first element
         if len(segments) >= 1:
-            raw = segments[0].raw
-            pos = segments[0].pos_marker
-            raw_comp = raw.upper()
-
-            if cls._template == raw_comp:
-                m = (cls(raw=raw, pos_marker=pos),)  # Return as a tuple
+            if cls._template == segments[0].raw_upper:
+                # Return as a tuple
+                m = (cls(raw=segments[0].raw, pos_marker=segments[0].pos_marker),)
                 return MatchResult(m, segments[1:])
         return MatchResult.from_unmatched(segments)
 
@@ -82,6 +81,8 @@ class KeywordSegment(_ProtoKeywordSegment):
     but don't end up being labelled as a `keyword` later.
     """
 
+    __slots__ = ()
+
     type = "keyword"
 
 
@@ -93,6 +94,8 @@ class SymbolSegment(_ProtoKeywordSegment):
     but don't end up being labelled as a `keyword` later.
     """
 
+    __slots__ = ()
+
     type = "symbol"
 
 
@@ -103,6 +106,8 @@ class ReSegment(_ProtoKeywordSegment):
     and so the `_ProtoKeywordSegment` should be used instead wherever possible.
     """
 
+    __slots__ = ()
+
     _anti_template = None
     """If `_anti_template` is set, then we exclude anything that matches it."""
 
@@ -157,6 +162,8 @@ class NamedSegment(_ProtoKeywordSegment):
     is largely identified by the Lexer.
     """
 
+    __slots__ = ()
+
     @classmethod
     def simple(cls, parse_context: ParseContext) -> Optional[List[str]]:
         """Does this matcher support a uppercase hash matching route?
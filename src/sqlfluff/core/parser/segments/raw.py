@@ -4,21 +4,38 @@ This is designed to be the root segment, without
 any children, and the output of the lexer.
 """
 
+from functools import lru_cache
+import sys
+
 from .base import BaseSegment
 
 
+@lru_cache(maxsize=4096)
+def _interned_upper(raw):
+    """Return the interned uppercase version of a raw string.
+
+    Most raw strings in a file are repeats (whitespace, commas,
+    keywords), so we cache these rather than calling `upper()`
+    on every new segment.
+    """
+    return sys.intern(raw.upper())
+
+
 class RawSegment(BaseSegment):
     """This is a segment without any subsegments."""
 
+    __slots__ = ["_raw", "_raw_upper"]
+
     type = "raw"
     _is_code = False
     _is_comment = False
     _template = "<unset>"
-    _raw_upper = None
 
     def __init__(self, raw, pos_marker):
-        self._raw = raw
-        self._raw_upper = raw.upper()
+        # Intern the raw string so that repeated tokens share the
+        # same string in memory, and compare by identity first.
+        self._raw = sys.intern(raw)
+        self._raw_upper = _interned_upper(self._raw)
         # pos marker is required here
         self.pos_marker = pos_marker
 
@@ -29,6 +46,11 @@ class RawSegment(BaseSegment):
 
     # ################ PUBLIC PROPERTIES
 
+    @property
+    def raw(self):
+        """Return the raw content of this segment."""
+        return self._raw
+
     @property
     def matched_length(self):
         """Return the length of the segment in characters."""
@@ -80,7 +102,8 @@ class RawSegment(BaseSegment):
         newclass = type(
             classname,
             (cls,),
-            dict(_template=_template, _name=name, **kwargs),
+            # NB: Setting empty slots stops instances getting a __dict__.
+            dict(__slots__=(), _template=_template, _name=name, **kwargs),
         )
         # Now we return that class in the abstract. NOT INSTANTIATED
         return newclass
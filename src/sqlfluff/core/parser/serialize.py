@@ -0,0 +1,470 @@
+"""A compact binary format for parse trees.
+
+This is for caching parse trees on disk or passing them between
+processes, where pickling is slow and bloated by the classes which
+are generated on the fly by `RawSegment.make` and the like.
+
+The format is a magic string and version number, followed by a
+zlib compressed body of:
+- A JSON header, which holds a table of the segment classes in the
+  tree, the `TemplatedFile` it was parsed from, and any strings or
+  attributes which can't be stored as integers.
+- An array of integers, for the position markers and then the nodes
+  of the tree in pre-order. Raw segments which are unchanged from the
+  templated file are stored just as their position, and their raw is
+  sliced back out of the templated string on loading.
+
+Segment classes are stored as a name in the dialect library where
+possible, otherwise by their import path, and otherwise (for classes
+made on the fly) as the recipe to make them again.
+"""
+
+from array import array
+import importlib
+import json
+import struct
+import sys
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..templaters.base import TemplatedFile, RawFileSlice, TemplatedFileSlice
+from .markers import FilePositionMarker, EnrichedFilePositionMarker
+from .segments import BaseSegment, RawSegment
+
+MAGIC = b"SQLFLUFF-TREE"
+VERSION = 1
+
+_version_struct = struct.Struct("<H")
+_lengths_struct = struct.Struct("<II")
+# Integers per marker and per node in the array.
+_MARKER_WIDTH = 11
+_NODE_WIDTH = 4
+# We use -1 to stand in for None. All real values are positive.
+_NONE = -1
+# These attributes are stored in the arrays or are just caches.
+_SKIP_ATTRS = frozenset(
+    ("segments", "pos_marker", "_raw", "_raw_upper", "_is_expandable")
+    + BaseSegment._cache_slots
+)
+# Classes we've made again when loading, so we only make each once.
+_made_classes: Dict[Tuple, type] = {}
+
+
+def _encode_value(value):
+    """Encode a class or instance attribute as JSON."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif isinstance(value, list):
+        return [_encode_value(elem) for elem in value]
+    elif isinstance(value, tuple):
+        return {"tuple": [_encode_value(elem) for elem in value]}
+    elif isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"dict": {key: _encode_value(elem) for key, elem in value.items()}}
+    raise TypeError("Cannot serialize value {0!r}".format(value))
+
+
+def _decode_value(value):
+    """Decode a value encoded by `_encode_value`."""
+    if isinstance(value, list):
+        return [_decode_value(elem) for elem in value]
+    elif isinstance(value, dict):
+        if "tuple" in value:
+            return tuple(_decode_value(elem) for elem in value["tuple"])
+        return {key: _decode_value(elem) for key, elem in value["dict"].items()}
+    return value
+
+
+def _int_or_none(value):
+    return _NONE if value is None else value
+
+
+def _none_or_int(value):
+    return None if value == _NONE else value
+
+
+class _TreeEncoder:
+    """Collects the tables for a tree as it's encoded."""
+
+    def __init__(self, dialect, templated_file):
+        self.templated_file = templated_file
+        self.segment_names = dialect.get_segment_names()
+        self.classes: List[Any] = []
+        self.class_idxs: Dict[type, int] = {}
+        self.strings: List[str] = []
+        self.string_idxs: Dict[str, int] = {}
+        self.extras: Dict[str, Dict[str, Any]] = {}
+        self.markers = array("i")
+        self.marker_idxs: Dict[int, int] = {}
+        self.marker_rows: Dict[Tuple[int, ...], int] = {}
+        # Keep a reference to markers, so their ids stay unique.
+        self._marker_refs: List[FilePositionMarker] = []
+        self.nodes = array("i")
+
+    def class_idx(self, cls):
+        """Get the index of a class in the class table, adding it if needed."""
+        try:
+            return self.class_idxs[cls]
+        except KeyError:
+            pass
+        if cls in self.segment_names:
+            entry = ["lib", self.segment_names[cls]]
+        elif getattr(sys.modules.get(cls.__module__), cls.__qualname__, None) is cls:
+            entry = ["module", cls.__module__, cls.__qualname__]
+        else:
+            # This class was made on the fly, so store how to make it.
+            if len(cls.__bases__) != 1:
+                raise TypeError("Cannot serialize segment class {0!r}".format(cls))
+            attrs = {
+                key: _encode_value(value)
+                for key, value in vars(cls).items()
+                if not key.startswith("__") and key != "_class_types"
+            }
+            slots = vars(cls).get("__slots__")
+            entry = [
+                "made",
+                cls.__name__,
+                self.class_idx(cls.__bases__[0]),
+                attrs,
+                None if slots is None else list(slots),
+                cls.__module__,
+            ]
+        self.class_idxs[cls] = len(self.classes)
+        self.classes.append(entry)
+        return self.class_idxs[cls]
+
+    def string_idx(self, string):
+        """Get the index of a string in the string table, adding it if needed."""
+        if string not in self.string_idxs:
+            self.string_idxs[string] = len(self.strings)
+            self.strings.append(string)
+        return self.string_idxs[string]
+
+    def marker_idx(self, marker):
+        """Get the index of a marker in the marker array, adding it if needed."""
+        if marker is None:
+            return _NONE
+        try:
+            return self.marker_idxs[id(marker)]
+        except KeyError:
+            pass
+        if isinstance(marker, EnrichedFilePositionMarker):
+            # Add the source marker first, so it's there when loading.
+            source_idx = self.marker_idx(marker.source_pos_marker)
+            row = (
+                1,
+                marker.templated_slice.start,
+                marker.templated_slice.stop,
+                marker.source_slice.start,
+                marker.source_slice.stop,
+                int(marker.is_literal),
+                source_idx,
+            )
+        else:
+            row = (0,) + (_NONE,) * 6
+        row = (
+            _int_or_none(marker.statement_index),
+            marker.line_no,
+            _int_or_none(marker.line_pos),
+            marker.char_pos,
+        ) + row
+        # Markers are never mutated, so we only store each distinct one
+        # once. Many segments have equal markers to their first child.
+        idx = self.marker_rows.get(row)
+        if idx is None:
+            idx = len(self.marker_rows)
+            self.marker_rows[row] = idx
+            self.markers.extend(row)
+        self.marker_idxs[id(marker)] = idx
+        self._marker_refs.append(marker)
+        return idx
+
+    def add_node(self, segment):
+        """Add a segment (but not its children) to the node array."""
+        node_idx = len(self.nodes) // _NODE_WIDTH
+        raw_idx = _NONE
+        if isinstance(segment, RawSegment):
+            n_children = _NONE
+            marker = segment.pos_marker
+            # Can we get the raw back from the templated file?
+            if not (
+                self.templated_file
+                and isinstance(marker, EnrichedFilePositionMarker)
+                and self.templated_file.templated_str[marker.templated_slice]
+                == segment.raw
+            ):
+                raw_idx = self.string_idx(segment.raw)
+        else:
+            n_children = len(segment.segments)
+        self.nodes.extend(
+            (
+                self.class_idx(type(segment)),
+                self.marker_idx(segment.pos_marker),
+                n_children,
+                raw_idx,
+            )
+        )
+        # Store any other instance attributes (e.g. on a TemplateSegment).
+        state = dict(getattr(segment, "__dict__", {}))
+        for cls in type(segment).__mro__:
+            for slot in cls.__dict__.get("__slots__", ()):
+                if hasattr(segment, slot):
+                    state[slot] = getattr(segment, slot)
+        extras = {
+            key: _encode_value(value)
+            for key, value in state.items()
+            if key not in _SKIP_ATTRS
+        }
+        if extras:
+            self.extras[str(node_idx)] = extras
+
+
+def _encode_templated_file(templated_file):
+    if not templated_file:
+        return None
+    return {
+        "source_str": templated_file.source_str,
+        "templated_str": (
+            None
+            if templated_file.templated_str == templated_file.source_str
+            else templated_file.templated_str
+        ),
+        "fname": templated_file.fname,
+        "sliced_file": [
+            [
+                elem.slice_type,
+                elem.source_slice.start,
+                elem.source_slice.stop,
+                elem.templated_slice.start,
+                elem.templated_slice.stop,
+            ]
+            for elem in templated_file.sliced_file
+        ],
+        "raw_sliced": [list(elem) for elem in templated_file.raw_sliced],
+    }
+
+
+def _decode_templated_file(encoded):
+    if not encoded:
+        return None
+    return TemplatedFile(
+        source_str=encoded["source_str"],
+        templated_str=encoded["templated_str"],
+        fname=encoded["fname"],
+        sliced_file=[
+            TemplatedFileSlice(
+                slice_type, slice(source_start, source_stop), slice(t_start, t_stop)
+            )
+            for slice_type, source_start, source_stop, t_start, t_stop in encoded[
+                "sliced_file"
+            ]
+        ],
+        raw_sliced=[RawFileSlice(*elem) for elem in encoded["raw_sliced"]],
+    )
+
+
+def _int_array_bytes(arr):
+    if sys.byteorder == "big":  # pragma: no cover
+        arr = array("i", arr)
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def dump_tree(
+    tree: BaseSegment, dialect, templated_file: Optional[TemplatedFile] = None
+) -> bytes:
+    """Serialize a parse tree (and optionally its `TemplatedFile`) to bytes.
+
+    Args:
+        tree (:obj:`BaseSegment`): The root of the tree to serialize.
+        dialect (:obj:`Dialect`): The dialect which the tree was parsed
+            with, which is used to refer to its segment classes by name.
+        templated_file (:obj:`TemplatedFile`, optional): The file which
+            the tree was parsed from. If given, it's stored with the tree
+            and the raw of unchanged segments isn't stored separately.
+
+    Raises:
+        TypeError: If the tree contains a segment class or attribute
+            which can't be serialized.
+
+    """
+    encoder = _TreeEncoder(dialect, templated_file)
+    # Walk the tree in pre-order, without recursion.
+    stack = [tree]
+    while stack:
+        segment = stack.pop()
+        encoder.add_node(segment)
+        if not isinstance(segment, RawSegment):
+            stack.extend(reversed(segment.segments))
+    header = json.dumps(
+        {
+            "dialect": dialect.name,
+            "classes": encoder.classes,
+            "strings": encoder.strings,
+            "extras": encoder.extras,
+            "templated_file": _encode_templated_file(templated_file),
+        },
+        separators=(",", ":"),
+    ).encode("utf8")
+    markers = _int_array_bytes(encoder.markers)
+    nodes = _int_array_bytes(encoder.nodes)
+    body = b"".join(
+        (_lengths_struct.pack(len(header), len(markers)), header, markers, nodes)
+    )
+    # Level 1 is fast, and gets most of the reduction in size.
+    return MAGIC + _version_struct.pack(VERSION) + zlib.compress(body, 1)
+
+
+def _load_class(entry, classes, dialect):
+    """Get the class for an entry in the class table."""
+    kind = entry[0]
+    if kind == "lib":
+        return dialect.ref(entry[1])
+    elif kind == "module":
+        return getattr(importlib.import_module(entry[1]), entry[2])
+    _, name, base_idx, attrs, slots, module = entry
+    base = classes[base_idx]
+    key = (base, name, json.dumps(attrs, sort_keys=True), json.dumps(slots))
+    if key not in _made_classes:
+        class_dict = {key: _decode_value(value) for key, value in attrs.items()}
+        class_dict["__module__"] = module
+        if slots is not None:
+            class_dict["__slots__"] = tuple(slots)
+        _made_classes[key] = type(name, (base,), class_dict)
+    return _made_classes[key]
+
+
+def _int_array(buff):
+    arr = array("i")
+    arr.frombytes(buff)
+    if sys.byteorder == "big":  # pragma: no cover
+        arr.byteswap()
+    return arr
+
+
+def load_tree(data: bytes, dialect) -> Tuple[BaseSegment, Optional[TemplatedFile]]:
+    """Load a parse tree serialized by `dump_tree`.
+
+    Args:
+        data (:obj:`bytes`): The serialized tree.
+        dialect (:obj:`Dialect`): The dialect which the tree was parsed
+            with. This must be the same as the one it was dumped with.
+
+    Returns:
+        A tuple of the root segment of the tree, and the `TemplatedFile`
+        it was dumped with (or None).
+
+    Raises:
+        ValueError: If the data isn't a serialized tree of this version,
+            or was dumped with a different dialect.
+
+    """
+    if not data.startswith(MAGIC):
+        raise ValueError("Data is not a serialized sqlfluff parse tree.")
+    (version,) = _version_struct.unpack_from(data, len(MAGIC))
+    if version != VERSION:
+        raise ValueError(
+            "Cannot load parse tree version {0}, expected {1}.".format(version, VERSION)
+        )
+    body = zlib.decompress(data[len(MAGIC) + _version_struct.size :])
+    header_len, markers_len = _lengths_struct.unpack_from(body)
+    offset = _lengths_struct.size
+    header = json.loads(body[offset : offset + header_len].decode("utf8"))
+    if header["dialect"] != dialect.name:
+        raise ValueError(
+            "Parse tree was dumped with dialect {0!r}, not {1!r}.".format(
+                header["dialect"], dialect.name
+            )
+        )
+    offset += header_len
+    marker_ints = _int_array(body[offset : offset + markers_len])
+    node_ints = _int_array(body[offset + markers_len :])
+
+    classes: List[type] = []
+    for entry in header["classes"]:
+        classes.append(_load_class(entry, classes, dialect))
+    strings = header["strings"]
+    extras = header["extras"]
+    templated_file = _decode_templated_file(header["templated_file"])
+
+    markers: List[FilePositionMarker] = []
+    for idx in range(0, len(marker_ints), _MARKER_WIDTH):
+        (
+            statement_index,
+            line_no,
+            line_pos,
+            char_pos,
+            kind,
+            t_start,
+            t_stop,
+            s_start,
+            s_stop,
+            is_literal,
+            source_idx,
+        ) = marker_ints[idx : idx + _MARKER_WIDTH]
+        if kind:
+            markers.append(
+                EnrichedFilePositionMarker(
+                    statement_index=_none_or_int(statement_index),
+                    line_no=line_no,
+                    line_pos=_none_or_int(line_pos),
+                    char_pos=char_pos,
+                    templated_slice=slice(t_start, t_stop),
+                    source_slice=slice(s_start, s_stop),
+                    is_literal=bool(is_literal),
+                    source_pos_marker=markers[source_idx],
+                )
+            )
+        else:
+            markers.append(
+                FilePositionMarker(
+                    statement_index=_none_or_int(statement_index),
+                    line_no=line_no,
+                    line_pos=_none_or_int(line_pos),
+                    char_pos=char_pos,
+                )
+            )
+
+    # Rebuild the tree from the pre-order nodes. The stack holds each
+    # segment which is still waiting for children, along with how many
+    # it needs and a buffer of the ones it has so far.
+    root = None
+    stack: List[Tuple[BaseSegment, int, List[BaseSegment]]] = []
+    for node_idx in range(len(node_ints) // _NODE_WIDTH):
+        offset = node_idx * _NODE_WIDTH
+        class_idx, marker_idx, n_children, raw_idx = node_ints[
+            offset : offset + _NODE_WIDTH
+        ]
+        cls = classes[class_idx]
+        marker = None if marker_idx == _NONE else markers[marker_idx]
+        # NB: We don't call the class's own __init__, because subclasses
+        # have different signatures. Any attributes they set are restored
+        # from the extras below.
+        segment = cls.__new__(cls)
+        if n_children == _NONE:
+            if raw_idx == _NONE:
+                raw = templated_file.templated_str[marker.templated_slice]
+            else:
+                raw = strings[raw_idx]
+            RawSegment.__init__(segment, raw, marker)
+        else:
+            segment.pos_marker = marker
+            segment.segments = ()
+        for key, value in extras.get(str(node_idx), {}).items():
+            setattr(segment, key, _decode_value(value))
+
+        if n_children > 0:
+            stack.append((segment, n_children, []))
+            continue
+        # This segment is complete, so add it to its parent, and complete
+        # any parents which now have all their children.
+        while stack:
+            parent, n_parent_children, children = stack[-1]
+            children.append(segment)
+            if len(children) < n_parent_children:
+                break
+            stack.pop()
+            parent.segments = tuple(children)
+            segment = parent
+        else:
+            root = segment
+    return root, templated_file
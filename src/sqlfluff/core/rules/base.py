@@ -16,10 +16,12 @@ missing.
 
 import copy
 import logging
+import time
 from collections import namedtuple
 
 from ..parser import RawSegment, KeywordSegment, BaseSegment
 from ..errors import SQLLintError
+from .views import ParentStackView, SegmentSequenceView
 
 # The ghost of a rule (mostly used for testing)
 RuleGhost = namedtuple("RuleGhost", ["code", "description"])
@@ -187,9 +189,48 @@ class BaseCrawler:
         description (:obj:`str`): A human readable description of what this
             rule does. It will be displayed when any violations are found.
 
+    NB: `_crawl_types`, `_crawl_raw_only` and `_statement_local` describe
+    the `_eval` of the class which sets them. A subclass (e.g. a plugin
+    rule based on one of the standard rules) which defines its own
+    `_eval` doesn't inherit them, so must set them again if they apply.
+
     """
 
     _works_on_unparsable = True
+    # The types of segment which the rule is evaluated on. By default
+    # it's evaluated on all of them, but most rules only ever act on a
+    # few types, and declaring them here saves a call to `_eval` (and
+    # the cost of its arguments) for every other segment.
+    _crawl_types = None
+    # Set this if the rule only ever acts on raw segments.
+    _crawl_raw_only = False
+    # Set this if the results of the rule within a top-level statement
+    # only depend on that statement, so they can be cached when linting.
+    # That means not looking outside the statement in the raw stack,
+    # parent stack or siblings, nor at absolute positions, nor relying
+    # on memory from before the statement (or after it on memory from
+    # within it). Rules which need file context, like L003, don't.
+    _statement_local = False
+    # How many times `_eval` has been called on this instance of the
+    # rule, how many of those raised an exception, and how long they
+    # took in total (in seconds).
+    eval_calls = 0
+    eval_errors = 0
+    eval_time = 0.0
+    # The attributes above which describe what `_eval` does.
+    _eval_declarations = ("_crawl_types", "_crawl_raw_only", "_statement_local")
+
+    def __init_subclass__(cls, **kwargs):
+        """Reset the declarations about `_eval` when a subclass overrides it.
+
+        Otherwise a subclass which evaluates other segments would never
+        be evaluated on them, and would be cached when it shouldn't be.
+        """
+        super().__init_subclass__(**kwargs)
+        if "_eval" in cls.__dict__:
+            for name in cls._eval_declarations:
+                if name not in cls.__dict__:
+                    setattr(cls, name, getattr(BaseCrawler, name))
 
     def __init__(self, code, description, **kwargs):
         self.description = description
@@ -241,33 +282,30 @@ class BaseCrawler:
             ).format(self.__class__.__name__)
         )
 
-    def crawl(
+    @classmethod
+    def _is_crawl_target(cls, segment):
+        """Return True if the rule is evaluated on this segment."""
+        if cls._crawl_raw_only and segment.segments:
+            return False
+        return cls._crawl_types is None or segment.is_type(*cls._crawl_types)
+
+    def _crawl_segment(
         self,
         segment,
         dialect,
-        parent_stack=None,
-        siblings_pre=None,
-        siblings_post=None,
-        raw_stack=None,
-        fix=False,
-        memory=None,
+        parent_stack,
+        siblings_pre,
+        siblings_post,
+        raw_stack,
+        memory,
     ):
-        """Recursively perform the crawl operation on a given segment.
+        """Evaluate the rule on a single segment, without recursing.
 
         Returns:
-            A tuple of (vs, raw_stack, fixes, memory)
+            A tuple of (vs, fixes, memory, descend), where descend is
+            False if the crawl shouldn't carry on into the children.
 
         """
-        # parent stack should be a tuple if it exists
-
-        # crawlers, should evaluate on segments FIRST, before evaluating on their
-        # children. They should also return a list of violations.
-
-        parent_stack = parent_stack or ()
-        raw_stack = raw_stack or ()
-        siblings_post = siblings_post or ()
-        siblings_pre = siblings_pre or ()
-        memory = memory or {}
         vs = []
         fixes = []
 
@@ -275,9 +313,14 @@ class BaseCrawler:
         # this rule will still operate on that.
         if not self._works_on_unparsable and segment.is_type("unparsable"):
             # Abort here if it doesn't. Otherwise we'll get odd results.
-            return vs, raw_stack, [], memory
+            return vs, fixes, memory, False
+
+        # Then, whether the rule is interested in this segment at all.
+        if not self._is_crawl_target(segment):
+            return vs, fixes, memory, True
 
         # TODO: Document what options are available to the evaluation function.
+        t0 = time.perf_counter()
         try:
             res = self._eval(
                 segment=segment,
@@ -291,6 +334,7 @@ class BaseCrawler:
         # Any exception at this point would halt the linter and
         # cause the user to get no results
         except Exception as e:
+            self.eval_errors += 1
             self.logger.critical(
                 f"Applying rule {self.code} threw an Exception: {e}", exc_info=True
             )
@@ -308,7 +352,10 @@ class BaseCrawler:
                     ),
                 )
             )
-            return vs, raw_stack, fixes, memory
+            return vs, fixes, memory, False
+        finally:
+            self.eval_calls += 1
+            self.eval_time += time.perf_counter() - t0
 
         if res is None:
             # Assume this means no problems (also means no memory)
@@ -337,27 +384,83 @@ class BaseCrawler:
                     res, self.code
                 )
             )
+        return vs, fixes, memory, True
 
-        # The raw stack only keeps track of the previous raw segments
-        if len(segment.segments) == 0:
-            raw_stack += (segment,)
-        # Parent stack keeps track of all the parent segments
-        parent_stack += (segment,)
+    def crawl(
+        self,
+        segment,
+        dialect,
+        parent_stack=None,
+        siblings_pre=None,
+        siblings_post=None,
+        raw_stack=None,
+        fix=False,
+        memory=None,
+    ):
+        """Recursively perform the crawl operation on a given segment.
 
-        for idx, child in enumerate(segment.segments):
-            dvs, raw_stack, child_fixes, memory = self.crawl(
-                segment=child,
+        Returns:
+            A tuple of (vs, raw_stack, fixes, memory)
+
+        """
+        # crawlers, should evaluate on segments FIRST, before evaluating on their
+        # children. They should also return a list of violations.
+        vs = []
+        fixes = []
+        # The raw stack is kept as one list for the whole crawl, which
+        # only ever grows, and each segment sees a view of it so far.
+        raw_segments = list(raw_stack or ())
+        # Rather than recursing, keep a stack of the segments still to
+        # crawl (with their context), with the next one on top.
+        stack = [
+            (
+                segment,
+                ParentStackView.from_segments(parent_stack or ()),
+                siblings_pre or (),
+                siblings_post or (),
+            )
+        ]
+        while stack:
+            segment, parent_stack, siblings_pre, siblings_post = stack.pop()
+            memory = memory or {}
+            seg_vs, seg_fixes, memory, descend = self._crawl_segment(
+                segment=segment,
+                dialect=dialect,
                 parent_stack=parent_stack,
-                siblings_pre=segment.segments[:idx],
-                siblings_post=segment.segments[idx + 1 :],
-                raw_stack=raw_stack,
-                fix=fix,
+                siblings_pre=siblings_pre,
+                siblings_post=siblings_post,
+                raw_stack=SegmentSequenceView(raw_segments),
                 memory=memory,
-                dialect=dialect,
             )
-            vs += dvs
-            fixes += child_fixes
-        return vs, raw_stack, fixes, memory
+            vs += seg_vs
+            fixes += seg_fixes
+            if not descend:
+                continue
+
+            # The raw stack only keeps track of the previous raw segments
+            if len(segment.segments) == 0:
+                raw_segments.append(segment)
+                continue
+            # Parent stack keeps track of all the parent segments
+            stack += self._iter_children_reversed(segment, parent_stack)
+        return vs, tuple(raw_segments), fixes, memory
+
+    @staticmethod
+    def _iter_children_reversed(segment, parent_stack):
+        """Iterate the children of a segment with their context, last first.
+
+        This is the order to push them onto a crawl stack, so that
+        they're popped (and so evaluated) in order.
+        """
+        parent_stack = parent_stack.push(segment)
+        segments = segment.segments
+        for idx in range(len(segments) - 1, -1, -1):
+            yield (
+                segments[idx],
+                parent_stack,
+                SegmentSequenceView(segments, 0, idx),
+                SegmentSequenceView(segments, idx + 1),
+            )
 
     # HELPER METHODS --------
 
@@ -377,7 +480,8 @@ class BaseCrawler:
     def get_parent_of(cls, segment, root_segment):
         """Return the segment immediately containing segment.
 
-        NB: This is recursive.
+        NB: This is recursive, unless the tree has been indexed
+        with `index_types`, in which case it's a lookup.
 
         Args:
             segment: The segment to look for.
@@ -386,6 +490,9 @@ class BaseCrawler:
                 direct parent in question).
 
         """
+        path = root_segment._indexed_path_to(segment)
+        if path and len(path) > 1:
+            return path[-2]
         if segment in root_segment.segments:
             return root_segment
         elif root_segment.segments:
@@ -421,6 +528,248 @@ class BaseCrawler:
         return kws(raw=raw, pos_marker=pos_marker)
 
 
+class _CachedStatement:
+    """A top-level statement being crawled by a `MultiCrawler` with a cache."""
+
+    __slots__ = ["statement", "key", "raw_start", "hits", "misses"]
+
+    def __init__(self, statement, key, raw_start):
+        self.statement = statement
+        self.key = key
+        # How many raw segments came before the statement.
+        self.raw_start = raw_start
+        # The states of the rules which had cached results.
+        self.hits = []
+        # The states of the rules which didn't, with how many violations,
+        # fixes and errors they had before the statement.
+        self.misses = []
+
+
+class _CrawlState:
+    """The progress of one rule through a `MultiCrawler` crawl."""
+
+    __slots__ = ["crawler", "idx", "vs", "fixes", "memory", "raw_segments"]
+
+    def __init__(self, crawler, idx):
+        self.crawler = crawler
+        # The position of the rule, in the list of crawlers.
+        self.idx = idx
+        self.vs = []
+        self.fixes = []
+        self.memory = None
+        # While the rule has seen every raw segment so far, it shares
+        # the raw segments of the crawl and this is None.
+        self.raw_segments = None
+
+
+class MultiCrawler:
+    """Crawls a tree once, evaluating several rules at each segment.
+
+    This gives the same results as calling `crawl` on each rule in
+    turn, but the parent stack, siblings and raw stack for each
+    segment are only built once, and shared between the rules.
+
+    Args:
+        crawlers (:obj:`list` of :obj:`BaseCrawler`): The rules to
+            evaluate, in order.
+        cache (:obj:`StatementCache`, optional): A cache of the results
+            of statement local rules on each top-level statement. If given,
+            these rules skip statements which they've seen before. The
+            tree must be indexed with `index_types` for this to work.
+
+    """
+
+    def __init__(self, crawlers, cache=None):
+        self.crawlers = crawlers
+        self.cache = cache
+        # Which rules are evaluated on each class of segment, cached by
+        # class and whether it's raw (as a tuple of bools in rule order).
+        self._targets = {}
+
+    def crawl(self, segment, dialect):
+        """Crawl a tree with all the rules.
+
+        Returns:
+            A list of (vs, fixes) tuples, one for each rule in order.
+
+        """
+        all_states = [
+            _CrawlState(crawler, idx) for idx, crawler in enumerate(self.crawlers)
+        ]
+        raw_segments = []
+        # Rather than recursing, keep a stack of the segments still to
+        # crawl, with their context and the rules which are descending.
+        stack = [(segment, ParentStackView(), (), (), all_states)]
+        while stack:
+            entry = stack.pop()
+            if isinstance(entry, _CachedStatement):
+                # We've finished crawling a statement.
+                self._leave_statement(entry, raw_segments)
+                continue
+            segment, parent_stack, siblings_pre, siblings_post, states = entry
+            if (
+                self.cache is not None
+                and len(parent_stack) == 1
+                and segment.is_type("statement")
+            ):
+                states = self._enter_statement(
+                    segment, dialect, raw_segments, states, stack
+                )
+                if not states:
+                    continue
+            descending = self._eval_segment(
+                segment,
+                dialect,
+                parent_stack,
+                siblings_pre,
+                siblings_post,
+                raw_segments,
+                states,
+            )
+            # NB: If no rules are descending, then none of them share the
+            # raw segments any more, so we don't need to keep them up to date.
+            if not descending:
+                continue
+            if len(segment.segments) == 0:
+                raw_segments.append(segment)
+                continue
+            stack += (
+                context + (descending,)
+                for context in BaseCrawler._iter_children_reversed(
+                    segment, parent_stack
+                )
+            )
+        return [(state.vs, state.fixes) for state in all_states]
+
+    def _enter_statement(self, segment, dialect, raw_segments, states, stack):
+        """Use any cached results of the rules for a top-level statement.
+
+        Returns:
+            The rules which still need to crawl the statement.
+
+        """
+        key = self.cache.statement_key(segment, dialect)
+        if key is None:
+            return states
+        mark = _CachedStatement(segment, key, len(raw_segments))
+        remaining = []
+        for state in states:
+            if not state.crawler._statement_local:
+                remaining.append(state)
+                continue
+            cached = self.cache.lookup(state.crawler, key, segment)
+            if cached is None:
+                mark.misses.append(
+                    (
+                        state,
+                        len(state.vs),
+                        len(state.fixes),
+                        state.crawler.eval_errors,
+                    )
+                )
+                remaining.append(state)
+            else:
+                state.vs += cached[0]
+                state.fixes += cached[1]
+                mark.hits.append(state)
+        if not mark.hits and not mark.misses:
+            return states
+        if remaining:
+            # Pushed under the children, so it's popped once they're done.
+            stack.append(mark)
+        else:
+            # Every rule had cached results, so skip the statement.
+            self._leave_statement(mark, raw_segments)
+        return remaining
+
+    def _leave_statement(self, mark, raw_segments):
+        """Cache the results of the rules on a statement, once crawled."""
+        for state, num_vs, num_fixes, num_errors in mark.misses:
+            # The descriptions of exceptions include their positions.
+            if state.crawler.eval_errors == num_errors:
+                self.cache.store(
+                    state.crawler,
+                    mark.key,
+                    mark.statement,
+                    state.vs[num_vs:],
+                    state.fixes[num_fixes:],
+                )
+        if not mark.hits:
+            return
+        # The rules which skipped the statement still need its raw
+        # segments in their raw stacks.
+        index, start, stop = self.cache.statement_range(mark.statement)
+        statement_raws = [seg for seg in index.segments[start:stop] if not seg.segments]
+        num_shared = len(raw_segments) - mark.raw_start
+        if num_shared == 0:
+            # No rule shared the raw segments within the statement.
+            raw_segments += statement_raws
+        for state in mark.hits:
+            if state.raw_segments is not None:
+                state.raw_segments += statement_raws
+            elif num_shared not in (0, len(statement_raws)):
+                # Only some of the raw segments within the statement were
+                # shared, so this rule needs raw segments of its own.
+                state.raw_segments = raw_segments[: mark.raw_start] + statement_raws
+
+    def _eval_segment(
+        self,
+        segment,
+        dialect,
+        parent_stack,
+        siblings_pre,
+        siblings_post,
+        raw_segments,
+        states,
+    ):
+        """Evaluate the rules still descending on a single segment.
+
+        Returns:
+            The rules which are still descending after this segment.
+
+        """
+        is_raw = len(segment.segments) == 0
+        key = (type(segment), is_raw)
+        try:
+            targets = self._targets[key]
+        except KeyError:
+            targets = self._targets[key] = tuple(
+                crawler._is_crawl_target(segment) for crawler in self.crawlers
+            )
+        # Rules which don't work on unparsable segments have to see them
+        # either way, so that they know not to descend.
+        is_unparsable = segment.is_type("unparsable")
+        raw_stack = SegmentSequenceView(raw_segments)
+        descending = []
+        for state in states:
+            if targets[state.idx] or is_unparsable:
+                if state.raw_segments is None:
+                    state_raw_stack = raw_stack
+                else:
+                    state_raw_stack = SegmentSequenceView(state.raw_segments)
+                vs, fixes, state.memory, descend = state.crawler._crawl_segment(
+                    segment=segment,
+                    dialect=dialect,
+                    parent_stack=parent_stack,
+                    siblings_pre=siblings_pre,
+                    siblings_post=siblings_post,
+                    raw_stack=state_raw_stack,
+                    memory=state.memory or {},
+                )
+                state.vs += vs
+                state.fixes += fixes
+                if not descend:
+                    # This rule skips the rest of this segment, so from here
+                    # on it needs raw segments of its own.
+                    if state.raw_segments is None:
+                        state.raw_segments = list(raw_stack)
+                    continue
+            if is_raw and state.raw_segments is not None:
+                state.raw_segments.append(segment)
+            descending.append(state)
+        return descending
+
+
 class RuleSet:
     """Class to define a ruleset.
 
@@ -0,0 +1,181 @@
+"""Caching the results of rules on statements which have been seen before.
+
+In projects with a lot of repetition (like dbt projects), the same
+statements turn up again and again, in one file or across many. Rules
+which only look within a top-level statement (those which set
+`_statement_local`) give the same results on every copy of it, so when
+linting we can reuse their results rather than crawl each copy.
+
+The results are cached by the rule (and its config), the dialect and a
+hash of the structure of the statement. Segments are referred to by
+their position within the statement, so that a cached violation can be
+moved onto the same segment of another copy, which has its own position
+in its own file.
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+
+from ..errors import SQLLintError
+
+
+class StatementCache:
+    """Caches the results of statement local rules on each statement.
+
+    One cache can be shared between many files (e.g. all the files
+    linted by a `Linter`), which is where it helps most. To keep its
+    memory use down over many files, only the `max_size` most recently
+    used results are kept.
+
+    Args:
+        max_size (:obj:`int`, optional): The most results (each of one
+            rule on one statement) to keep. If None or 0, there's no
+            limit.
+
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def statement_range(statement):
+        """Get the (index, start, stop) of a statement in its indexed tree.
+
+        Returns None if the tree hasn't been indexed with `index_types`.
+        """
+        type_index = getattr(statement, "_cache_type_index", None)
+        if not type_index or not type_index[0]:
+            return None
+        return type_index
+
+    @classmethod
+    def statement_key(cls, statement, dialect):
+        """Hash the structure of a statement, to look up its results.
+
+        Returns None if the statement can't be cached.
+        """
+        statement_range = cls.statement_range(statement)
+        if not statement_range:
+            return None
+        index, start, stop = statement_range
+        digest = hashlib.blake2b(dialect.name.encode("utf8"), digest_size=16)
+        for seg in index.segments[start:stop]:
+            # The raw is only needed for raw segments, and the number of
+            # children for the rest, to pin down the whole tree.
+            raw = "" if seg.segments else seg.raw
+            digest.update(
+                "{0}|{1}|{2}|{3}|{4}:{5}\n".format(
+                    type(seg).__name__,
+                    seg.type,
+                    seg.name,
+                    len(seg.segments),
+                    len(raw),
+                    raw,
+                ).encode("utf8")
+            )
+        return digest.digest()
+
+    @staticmethod
+    def _rule_key(crawler):
+        return (
+            type(crawler),
+            crawler.code,
+            tuple(
+                repr(getattr(crawler, keyword, None))
+                for keyword in getattr(crawler, "config_keywords", ())
+            ),
+        )
+
+    def lookup(self, crawler, key, statement):
+        """Get the cached (vs, fixes) of a rule for a statement, if any."""
+        result_key = (self._rule_key(crawler), key)
+        encoded = self._results.get(result_key)
+        if encoded is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(result_key)
+        index, start, _ = self.statement_range(statement)
+        codec = _StatementCodec(index, start, None)
+        vs = [codec.decode_violation(v, crawler) for v in encoded[0]]
+        fixes = [codec.decode_fix(fix) for fix in encoded[1]]
+        return vs, fixes
+
+    def store(self, crawler, key, statement, vs, fixes):
+        """Cache the (vs, fixes) of a rule for a statement.
+
+        Results which refer to segments outside the statement aren't
+        cached, because they wouldn't be the same for another copy.
+        """
+        codec = _StatementCodec(*self.statement_range(statement))
+        try:
+            encoded = (
+                [codec.encode_violation(v) for v in vs],
+                [codec.encode_fix(fix) for fix in fixes],
+            )
+        except ValueError:
+            return
+        result_key = (self._rule_key(crawler), key)
+        self._results[result_key] = encoded
+        self._results.move_to_end(result_key)
+        if self.max_size:
+            # Evict the least recently used results.
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+
+class _StatementCodec:
+    """Refers to segments by their position within a statement.
+
+    Fixes are kept without their anchor, which is referred to by
+    position like any other segment. Their edits are already copies
+    (see `LintFix`) rather than part of the tree, so can be shared.
+    """
+
+    def __init__(self, index, start, stop):
+        self.index = index
+        self.start = start
+        self.stop = stop
+
+    def encode(self, segment):
+        pos = self.index.lookup.get(id(segment))
+        if pos is None or not self.start <= pos < self.stop:
+            raise ValueError("Segment is outside the statement.")
+        return pos - self.start
+
+    def decode(self, encoded):
+        return self.index.segments[self.start + encoded]
+
+    def encode_fix(self, fix):
+        anchor = self.encode(fix.anchor)
+        # NB: Don't keep hold of the anchor, or the cache would keep
+        # the whole tree alive.
+        fix = copy.copy(fix)
+        fix.anchor = None
+        return fix, anchor
+
+    def decode_fix(self, encoded):
+        fix, anchor = encoded
+        fix = copy.copy(fix)
+        fix.anchor = self.decode(anchor)
+        return fix
+
+    def encode_violation(self, violation):
+        return (
+            self.encode(violation.segment),
+            violation.description,
+            [self.encode_fix(fix) for fix in violation.fixes],
+        )
+
+    def decode_violation(self, encoded, rule):
+        segment, description, fixes = encoded
+        return SQLLintError(
+            rule=rule,
+            segment=self.decode(segment),
+            fixes=[self.decode_fix(fix) for fix in fixes],
+            description=description,
+        )
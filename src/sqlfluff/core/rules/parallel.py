@@ -0,0 +1,193 @@
+"""Crawling a tree with groups of rules in parallel processes.
+
+When linting (but not fixing), the rules don't affect each other, so
+for very large files they can be split into groups and crawled at the
+same time. The tree is passed to each worker in the compact binary
+format of `dump_tree`, and the violations are passed back with their
+segments referred to by position in the tree, so that the results are
+the same as crawling in a single process.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+
+from ..dialects import dialect_selector
+from ..errors import SQLLintError
+from ..parser import dump_tree, load_tree
+from .base import LintFix, MultiCrawler, rules_logger
+
+
+class _SegmentCodec:
+    """Refers to segments by their position in an indexed tree.
+
+    The position is relative to the `start` of the (sub)tree which is
+    crawled, which might be within a larger indexed tree. Segments which
+    aren't in it (like the edits of fixes) are serialized instead.
+    """
+
+    def __init__(self, type_index, dialect):
+        self.index, self.start, self.stop = type_index
+        self.dialect = dialect
+
+    @classmethod
+    def for_tree(cls, tree, dialect):
+        """Make a codec for a tree, indexing it if it isn't already."""
+        type_index = getattr(tree, "_cache_type_index", None)
+        if not type_index or not type_index[0]:
+            tree.index_types()
+            type_index = tree._cache_type_index
+        return cls(type_index, dialect)
+
+    def encode(self, segment):
+        pos = self.index.lookup.get(id(segment))
+        if pos is not None and self.start <= pos < self.stop:
+            return (True, pos - self.start)
+        return (False, dump_tree(segment, self.dialect))
+
+    def decode(self, encoded):
+        in_tree, value = encoded
+        if in_tree:
+            return self.index.segments[self.start + value]
+        return load_tree(value, self.dialect)[0]
+
+    def encode_fix(self, fix):
+        return (
+            fix.edit_type,
+            self.encode(fix.anchor),
+            [self.encode(seg) for seg in fix.edit] if fix.edit else None,
+        )
+
+    def decode_fix(self, encoded):
+        edit_type, anchor, edit = encoded
+        return LintFix(
+            edit_type,
+            self.decode(anchor),
+            [self.decode(seg) for seg in edit] if edit else None,
+        )
+
+    def encode_violation(self, violation):
+        return (
+            self.encode(violation.segment),
+            violation.description,
+            [self.encode_fix(fix) for fix in violation.fixes],
+        )
+
+    def decode_violation(self, encoded, rule):
+        segment, description, fixes = encoded
+        return SQLLintError(
+            rule=rule,
+            segment=self.decode(segment),
+            fixes=[self.decode_fix(fix) for fix in fixes],
+            description=description,
+        )
+
+
+def _crawl_serialized(tree_data, dialect_name, crawler_data):
+    """Crawl a serialized tree with some rules, in a worker process.
+
+    Returns:
+        A list of the encoded (vs, fixes) for each rule in order, and
+        a list of the (eval_calls, eval_time) for each rule in order.
+
+    """
+    dialect = dialect_selector(dialect_name)
+    tree, _ = load_tree(tree_data, dialect)
+    codec = _SegmentCodec.for_tree(tree, dialect)
+    crawlers = pickle.loads(crawler_data)
+    # Only count the work done here, which is added to the originals.
+    for crawler in crawlers:
+        crawler.eval_calls = 0
+        crawler.eval_time = 0.0
+    results = [
+        (
+            [codec.encode_violation(v) for v in vs],
+            [codec.encode_fix(fix) for fix in fixes],
+        )
+        for vs, fixes in MultiCrawler(crawlers).crawl(tree, dialect)
+    ]
+    return results, [(crawler.eval_calls, crawler.eval_time) for crawler in crawlers]
+
+
+class ParallelCrawler(MultiCrawler):
+    """Crawls a tree with groups of rules in parallel processes.
+
+    The rules are split into groups, one of which is crawled in this
+    process while the others are crawled in worker processes. The
+    results are the same as for `MultiCrawler`.
+
+    Args:
+        crawlers (:obj:`list` of :obj:`BaseCrawler`): The rules to
+            evaluate, in order.
+        processes (:obj:`int`): How many processes to split the rules
+            between, including this one.
+        executor (:obj:`ProcessPoolExecutor`, optional): A pool of at
+            least `processes - 1` workers to crawl with, so that it can
+            be reused between files. If not given, a pool is started
+            (and shut down) on each crawl.
+
+    """
+
+    def __init__(self, crawlers, processes, executor=None):
+        super().__init__(crawlers)
+        self.processes = processes
+        self.executor = executor
+
+    def crawl(self, segment, dialect):
+        """Crawl a tree with all the rules.
+
+        Returns:
+            A list of (vs, fixes) tuples, one for each rule in order.
+
+        """
+        processes = min(self.processes, len(self.crawlers))
+        if processes < 2:
+            return super().crawl(segment, dialect)
+        # Deal the rules out between the groups, so that the expensive
+        # ones (which are spread through the list) are shared out too.
+        groups = [
+            list(range(idx, len(self.crawlers), processes)) for idx in range(processes)
+        ]
+        try:
+            # User rules may not be importable by the workers, nor user
+            # segments serializable.
+            crawler_data = [
+                pickle.dumps([self.crawlers[idx] for idx in group])
+                for group in groups[1:]
+            ]
+            tree_data = dump_tree(segment, dialect)
+        except (pickle.PicklingError, AttributeError, TypeError) as err:
+            rules_logger.warning(
+                "Can't crawl these rules in parallel, so crawling them in one process: %s",
+                err,
+            )
+            return super().crawl(segment, dialect)
+
+        codec = _SegmentCodec.for_tree(segment, dialect)
+        results = [None] * len(self.crawlers)
+        executor = self.executor or ProcessPoolExecutor(max_workers=len(crawler_data))
+        try:
+            futures = [
+                executor.submit(_crawl_serialized, tree_data, dialect.name, data)
+                for data in crawler_data
+            ]
+            # Crawl the first group here while the workers get on with theirs.
+            local = [self.crawlers[idx] for idx in groups[0]]
+            for idx, result in zip(
+                groups[0], MultiCrawler(local).crawl(segment, dialect)
+            ):
+                results[idx] = result
+            for group, future in zip(groups[1:], futures):
+                group_results, group_timings = future.result()
+                for idx, (eval_calls, eval_time) in zip(group, group_timings):
+                    # Credit the rules here with the work of their copies.
+                    self.crawlers[idx].eval_calls += eval_calls
+                    self.crawlers[idx].eval_time += eval_time
+                for idx, (vs, fixes) in zip(group, group_results):
+                    results[idx] = (
+                        [codec.decode_violation(v, self.crawlers[idx]) for v in vs],
+                        [codec.decode_fix(fix) for fix in fixes],
+                    )
+        finally:
+            if executor is not self.executor:
+                executor.shutdown()
+        return results
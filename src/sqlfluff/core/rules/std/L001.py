@@ -26,6 +26,9 @@ class Rule_L001(BaseCrawler):
         FROM foo
     """
 
+    _crawl_types = ("newline",)
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         """Unnecessary trailing whitespace.
 
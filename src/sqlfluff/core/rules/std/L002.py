@@ -32,6 +32,8 @@ class Rule_L002(BaseCrawler):
 
     """
 
+    _crawl_types = ("whitespace",)
+    _statement_local = True
     config_keywords = ["tab_space_size"]
 
     def _eval(self, segment, raw_stack, **kwargs):
@@ -38,6 +38,8 @@ class Rule_L004(BaseCrawler):
         from foo
     """
 
+    _crawl_types = ("whitespace",)
+    _statement_local = True
     config_keywords = ["indent_unit", "tab_space_size"]
 
     # TODO fix indents after text: https://github.com/sqlfluff/sqlfluff/pull/590#issuecomment-739484190
@@ -33,6 +33,9 @@ class Rule_L005(BaseCrawler):
         FROM foo
     """
 
+    _crawl_types = ("comma",)
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         """Commas should not have whitespace directly before them.
 
@@ -30,6 +30,8 @@ class Rule_L006(BaseCrawler):
         FROM foo
     """
 
+    _statement_local = True
+
     def _eval(self, segment, memory, parent_stack, **kwargs):
         """Operators should be surrounded by a single whitespace.
 
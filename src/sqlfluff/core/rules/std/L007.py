@@ -29,6 +29,8 @@ class Rule_L007(BaseCrawler):
         FROM foo
     """
 
+    _statement_local = True
+
     def _eval(self, segment, memory, parent_stack, **kwargs):
         """Operators near newlines should be after, not before the newline.
 
@@ -30,6 +30,8 @@ class Rule_L008(BaseCrawler):
         WHERE a IN ('plop',•'zoo')
     """
 
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         """Commas should be followed by a single whitespace unless followed by a comment.
 
@@ -8,6 +8,8 @@ from ..doc_decorators import document_fix_compatible
 class Rule_L009(BaseCrawler):
     """Files must end with a trailing newline."""
 
+    _crawl_raw_only = True
+
     def _eval(self, segment, siblings_post, parent_stack, **kwargs):
         """Files must end with a trailing newline.
 
@@ -29,11 +31,13 @@ class Rule_L009(BaseCrawler):
             return None
         else:
             # so this looks like the end of the file, but we
-            # need to check that each parent segment is also the last
-            file_len = len(parent_stack[0].raw)
+            # need to check that each parent segment is also the last.
+            # NB: The file may be one piece of a larger one (see
+            # `Linter.lint_large_file`), so its position isn't always zero.
+            file_end = parent_stack[0].pos_marker.char_pos + len(parent_stack[0].raw)
             pos = segment.pos_marker.char_pos
-            # Does the length of the file, equal the length of the segment plus its position
-            if file_len != pos + len(segment.raw):
+            # Does the end of the file, equal the end of the segment
+            if file_end != pos + len(segment.raw):
                 return None
 
         ins = self.make_newline(pos_marker=segment.pos_marker.advance_by(segment.raw))
@@ -28,6 +28,8 @@ class Rule_L011(BaseCrawler):
 
     """
 
+    _crawl_types = ("alias_expression",)
+    _statement_local = True
     _target_elems = ("table_expression",)
 
     def _eval(self, segment, parent_stack, raw_stack, **kwargs):
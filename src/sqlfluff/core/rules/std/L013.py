@@ -30,6 +30,8 @@ class Rule_L013(BaseCrawler):
 
     """
 
+    _crawl_types = ("select_target_element",)
+    _statement_local = True
     config_keywords = ["allow_scalar"]
 
     def _eval(self, segment, parent_stack, **kwargs):
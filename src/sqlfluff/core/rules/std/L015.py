@@ -25,6 +25,8 @@ class Rule_L015(BaseCrawler):
 
     """
 
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         """Looking for DISTINCT before a bracket.
 
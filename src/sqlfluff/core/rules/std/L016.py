@@ -14,6 +14,7 @@ from sqlfluff.core.rules.std.L003 import Rule_L003
 class Rule_L016(Rule_L003):
     """Line is too long."""
 
+    _crawl_types = ("newline",)
     config_keywords = ["max_line_length", "tab_space_size", "indent_unit"]
 
     def _eval_line_for_breaks(self, segments):
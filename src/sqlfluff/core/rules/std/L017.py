@@ -28,6 +28,9 @@ class Rule_L017(BaseCrawler):
 
     """
 
+    _crawl_types = ("function",)
+    _statement_local = True
+
     def _eval(self, segment, **kwargs):
         """Function name not immediately followed by bracket.
 
@@ -33,6 +33,7 @@ class Rule_L018(BaseCrawler):
 
     """
 
+    _crawl_types = ("with_compound_statement",)
     _works_on_unparsable = False
     config_keywords = ["tab_space_size"]
 
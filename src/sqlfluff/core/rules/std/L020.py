@@ -8,6 +8,9 @@ from ..base import BaseCrawler, LintResult
 class Rule_L020(BaseCrawler):
     """Table aliases should be unique within each clause."""
 
+    _crawl_types = ("select_statement",)
+    _statement_local = True
+
     def _lint_references_and_aliases(
         self,
         table_aliases,
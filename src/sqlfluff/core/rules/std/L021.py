@@ -27,6 +27,9 @@ class Rule_L021(BaseCrawler):
         FROM foo
     """
 
+    _crawl_types = ("select_statement",)
+    _statement_local = True
+
     def _eval(self, segment, **kwargs):
         """Ambiguous use of DISTINCT in select statement with GROUP BY."""
         if segment.is_type("select_statement"):
@@ -32,6 +32,8 @@ class Rule_L022(BaseCrawler):
 
     """
 
+    _crawl_types = ("with_compound_statement",)
+    _statement_local = True
     config_keywords = ["comma_style"]
 
     def _eval(self, segment, **kwargs):
@@ -33,6 +33,8 @@ class Rule_L023(BaseCrawler):
         SELECT a FROM plop
     """
 
+    _crawl_types = ("with_compound_statement",)
+    _statement_local = True
     expected_mother_segment_type = "with_compound_statement"
     pre_segment_identifier = ("name", "AS")
     post_segment_identifier = ("type", "start_bracket")
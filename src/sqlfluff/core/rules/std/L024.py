@@ -28,6 +28,7 @@ class Rule_L024(Rule_L023):
 
     """
 
+    _crawl_types = ("join_clause",)
     expected_mother_segment_type = "join_clause"
     pre_segment_identifier = ("name", "USING")
     post_segment_identifier = ("type", "start_bracket")
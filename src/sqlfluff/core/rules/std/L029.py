@@ -29,6 +29,7 @@ class Rule_L029(BaseCrawler):
 
     """
 
+    _statement_local = True
     config_keywords = ["only_aliases"]
 
     def _eval(self, segment, dialect, parent_stack, **kwargs):
@@ -42,6 +42,9 @@ class Rule_L031(BaseCrawler):
 
     """
 
+    _crawl_types = ("select_statement",)
+    _statement_local = True
+
     def _eval(self, segment, **kwargs):
         """Identify aliases in from clause and join conditions.
 
@@ -32,6 +32,9 @@ class Rule_L032(BaseCrawler):
 
     """
 
+    _crawl_types = ("join_clause",)
+    _statement_local = True
+
     def _eval(self, segment, **kwargs):
         """Look for USING in a join clause."""
         if segment.is_type("join_clause"):
@@ -22,6 +22,9 @@ class Rule_L033(BaseCrawler):
 
     """
 
+    _crawl_types = ("set_operator",)
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         """Look for UNION keyword not immediately followed by ALL keyword. Note that UNION DISTINCT is valid, rule only applies to bare UNION.
 
@@ -34,6 +34,9 @@ class Rule_L034(BaseCrawler):
 
     """
 
+    _crawl_types = ("select_clause",)
+    _statement_local = True
+
     def _validate(self, i, segment):
         # Check if we've seen a more complex select target element already
         if self.seen_band_elements[i + 1 : :] != [[]] * len(
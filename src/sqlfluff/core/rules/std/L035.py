@@ -33,6 +33,9 @@ class Rule_L035(BaseCrawler):
         from x
     """
 
+    _crawl_types = ("case_expression",)
+    _statement_local = True
+
     def _eval(self, segment, **kwargs):
         """Find rule violations and provide fixes.
 
@@ -29,6 +29,9 @@ class Rule_L036(BaseCrawler):
 
     """
 
+    _crawl_types = ("select_clause",)
+    _statement_local = True
+
     def _eval(self, segment, raw_stack, **kwargs):
         if segment.is_type("select_clause"):
             eval_result = self._get_indexes(segment)
@@ -39,6 +39,9 @@ class Rule_L037(BaseCrawler):
         ORDER BY a ASC, b DESC
     """
 
+    _crawl_types = ("orderby_clause",)
+    _statement_local = True
+
     @staticmethod
     def _get_orderby_info(segment: BaseSegment) -> List[OrderByColumnInfo]:
         assert segment.is_type("orderby_clause")
@@ -0,0 +1,151 @@
+"""Read-only views of segments, used as the context when crawling.
+
+When crawling, each rule is given the raw segments so far, the parents
+of the segment and its siblings. Building these as new tuples for every
+segment copies them over and over again, which on long files (or wide
+segments) grows quadratically. These views share the underlying lists
+and tuples instead.
+
+The views behave like the tuples they replace: they can be indexed,
+sliced, iterated and added to tuples, and they compare equal to tuples
+with the same contents. They're copied and pickled as tuples too. But
+they aren't instances of `tuple`, so code which checks for one should
+check for a `Sequence` instead (or make a tuple of the view first).
+"""
+
+from collections.abc import Sequence
+from itertools import islice
+
+
+class _SegmentSequence(Sequence):
+    """Tuple-like behaviour shared by the views."""
+
+    __slots__ = ()
+
+    def __add__(self, other):
+        if isinstance(other, (tuple, _SegmentSequence)):
+            return tuple(self) + tuple(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, (tuple, _SegmentSequence)):
+            return tuple(other) + tuple(self)
+        return NotImplemented
+
+    def __eq__(self, other):
+        if isinstance(other, (tuple, _SegmentSequence)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+    def __reduce__(self):
+        # Copy and pickle just the segments in view (as a tuple), rather
+        # than everything the view shares.
+        return (tuple, (tuple(self),))
+
+
+class SegmentSequenceView(_SegmentSequence):
+    """A view of a slice of a list or tuple of segments.
+
+    NB: If the underlying list is appended to, the view doesn't
+    change. This is how a raw stack shares one list for the whole
+    crawl, with each view seeing just the segments before it.
+
+    Args:
+        segments (:obj:`list` or :obj:`tuple`): The segments to view.
+        start (:obj:`int`): The index of the first segment in the view.
+        stop (:obj:`int`, optional): The index after the last segment
+            in the view. Defaults to the current length of `segments`.
+
+    """
+
+    __slots__ = ["_segments", "_start", "_stop"]
+
+    def __init__(self, segments, start=0, stop=None):
+        self._segments = segments
+        self._start = start
+        self._stop = len(segments) if stop is None else stop
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return tuple(
+                self._segments[idx] for idx in range(self._start, self._stop)[key]
+            )
+        length = self._stop - self._start
+        if key < 0:
+            key += length
+        if not 0 <= key < length:
+            raise IndexError("SegmentSequenceView index out of range")
+        return self._segments[self._start + key]
+
+    def __iter__(self):
+        return islice(self._segments, self._start, self._stop)
+
+    def __reversed__(self):
+        for idx in range(self._stop - 1, self._start - 1, -1):
+            yield self._segments[idx]
+
+
+class ParentStackView(_SegmentSequence):
+    """An immutable stack of parent segments, which shares its tail.
+
+    Pushing a segment makes a new stack without copying the old one,
+    and the last segment is available without building a tuple. The
+    rest are only gathered into a tuple if they're asked for.
+
+    Args:
+        segment (:obj:`BaseSegment`, optional): The segment on top of
+            the stack.
+        tail (:obj:`ParentStackView`, optional): The stack below it.
+
+    """
+
+    __slots__ = ["_segment", "_tail", "_len", "_tuple"]
+
+    def __init__(self, segment=None, tail=None):
+        self._segment = segment
+        self._tail = tail
+        self._len = 0 if tail is None else tail._len + 1
+        self._tuple = None
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Make a stack from a sequence of segments, outermost first."""
+        stack = cls()
+        for segment in segments:
+            stack = stack.push(segment)
+        return stack
+
+    def push(self, segment):
+        """Return a new stack with the segment on top."""
+        return type(self)(segment, self)
+
+    def _as_tuple(self):
+        if self._tuple is None:
+            self._tuple = tuple(list(reversed(self))[::-1])
+        return self._tuple
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        if key == -1 and self._len:
+            return self._segment
+        return self._as_tuple()[key]
+
+    def __iter__(self):
+        return iter(self._as_tuple())
+
+    def __reversed__(self):
+        stack = self
+        while stack._len:
+            yield stack._segment
+            stack = stack._tail
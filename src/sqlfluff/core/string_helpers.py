@@ -1,6 +1,35 @@
 """String Helpers for the parser module."""
 
-from typing import Iterator
+import re
+from functools import lru_cache
+from typing import Iterator, Optional, Tuple
+
+# Dollar quoted bodies (e.g. of postgres functions) are kept whole, even
+# for dialects which don't lex them, so that we never split inside one.
+_dollar_quote_template = (
+    r"\$(?P<dollar_tag>[A-Za-z_][A-Za-z_0-9]*|)\$.*?\$(?P=dollar_tag)\$"
+)
+
+# Text which the lexer can't match is taken up to the next delimiter, as
+# with the `last_resort_lexer` of the `Lexer`.
+_last_resort_regex = re.compile(rb"[^\t\n\,\.\ \-\+\*\\\/\'\"\;\:\[\]\(\)\|]+")
+
+# Semicolons don't end the statement within a BEGIN ... END block (e.g.
+# a procedure body) or a CASE ... END expression. BEGIN isn't reserved
+# in every dialect and also starts transactions, so it's only counted
+# as starting a block after one of these (None being the start of the
+# buffer)...
+_block_begin_after = frozenset(
+    [None, b";", b":", b")", b"AS", b"IS", b"THEN", b"ELSE", b"DO", b"LOOP", b"ROW"]
+    + [b"BEGIN"]
+)
+# ...and when followed by a word other than one of these.
+_not_block_keywords = frozenset(
+    [b"TRANSACTION", b"TRAN", b"WORK", b"ISOLATION", b"READ", b"DISTRIBUTED"]
+    + [b"END", b"ELSE", b"WHEN"]
+)
+# An END followed by one of these closes something we don't count.
+_uncounted_end_keywords = frozenset([b"IF", b"LOOP", b"WHILE", b"REPEAT", b"FOR"])
 
 
 def frame_msg(msg: str) -> str:
@@ -28,3 +57,251 @@ def findall(substr: str, in_str: str) -> Iterator[int]:
     while idx != -1:
         yield idx
         idx = in_str.find(substr, idx + 1)
+
+
+@lru_cache(maxsize=None)
+def _compile_statement_tokenizer(matchers: Tuple[Tuple[str, str, str], ...]):
+    """Compile a lexer struct into one bytes regex, to match its tokens.
+
+    As in the `Lexer`, the alternation is ordered so that the first
+    matcher to match wins.
+
+    Also compiles a regex to skip over runs of tokens which can't end
+    a statement or open or close a block, i.e. anything but semicolons
+    and words starting with BEGIN, END or CASE. This is much faster than
+    matching each token in turn, which we only need to do for the rest.
+
+    Returns:
+        :obj:`tuple` of (the combined regex, the compiled regexes of
+        each matcher, the name of each matcher, and the skipping regex).
+
+    """
+    templates = [_dollar_quote_template] + [
+        pattern if kind == "regex" else re.escape(pattern)
+        for _, kind, pattern in matchers
+    ]
+    names = ["dollar_quote"] + [name for name, _, _ in matchers]
+    regexes = [re.compile(template.encode(), re.DOTALL) for template in templates]
+    combined = re.compile(
+        "|".join(
+            "(?P<m{0}>{1})".format(idx, template)
+            for idx, template in enumerate(templates)
+        ).encode(),
+        re.DOTALL,
+    )
+    skip = re.compile(
+        "(?:{0})*".format(
+            "|".join(
+                (
+                    r"(?!(?i:begin|end|case)){0}".format(template)
+                    if name == "code"
+                    else template
+                )
+                for name, template in zip(names, templates)
+                if name != "semicolon"
+            )
+        ).encode(),
+        re.DOTALL,
+    )
+    return combined, regexes, names, skip
+
+
+def can_split_statements(lexer_struct) -> bool:
+    """Can files be split into statements on their semicolons?
+
+    Not if the dialect has statement terminators of its own, within
+    which semicolons end the statements of a script (e.g. exasol_fs).
+    """
+    return not any(
+        (kwargs or {}).get("type") == "statement_terminator"
+        for _, _, _, kwargs in lexer_struct
+    )
+
+
+def iter_statement_chunks(
+    buff, lexer_struct, max_block_size: int = 1024 * 1024, complete: bool = True
+) -> Iterator[bytes]:
+    """Split a buffer of sql into chunks, each of which ends a statement.
+
+    The buffer can be any bytes-like object, including an `mmap`, so
+    that a large file can be split without reading it all at once. It's
+    tokenized with the matchers of the dialect's `lexer_struct`, in the
+    same way as the `Lexer`, so that semicolons in quotes and comments
+    are treated the same as they will be when each chunk is lexed.
+
+    A chunk never ends in the middle of a statement, but may contain
+    several of them. We only split after a semicolon which is:
+
+    - At the end of its line (apart from whitespace and comments), so
+      that every chunk starts at the start of a line and ends with a
+      newline (except for the last).
+    - Outside any BEGIN ... END or CASE ... END block, or dollar quoted
+      body. A BEGIN is only counted where it looks like the start of a
+      block (see `_block_begin_after`), rather than e.g. a column name.
+
+    In case we've still misread a block (e.g. a BEGIN of a construct
+    we don't know which has no END), once a chunk is more than
+    `max_block_size` bytes long, the next semicolon at the end of a
+    line ends it anyway, so that the chunks stay small.
+
+    If some of the buffer can't be tokenized, it isn't split any further.
+    Any whitespace after the final statement is kept with it, rather
+    than returned as a chunk on its own.
+
+    If the buffer isn't `complete` (i.e. it's only the start of the sql),
+    then the last chunk may not be either, and we also stop splitting at
+    anything only the last resort of the lexer matches, which may be the
+    start of a quote or comment which ends further on.
+    """
+    combined, regexes, names, skip = _compile_statement_tokenizer(
+        tuple((name, kind, pattern) for name, kind, pattern, _ in lexer_struct)
+    )
+    comments = {
+        name for name, _, _, kwargs in lexer_struct if (kwargs or {}).get("is_comment")
+    }
+    insignificant = comments | {"whitespace", "newline"}
+
+    def last_token(pos, stop):
+        """The last significant token between two positions."""
+        last = prev
+        while pos < stop:
+            name, end = _match_token(buff, pos, combined, regexes, names)
+            if name is None:
+                break
+            if name not in insignificant:
+                last = buff[pos:end].upper()
+            pos = end
+        return last
+
+    buff_len = len(buff)
+    pos = start = 0
+    prev_chunk = None
+    # How many blocks we're inside, and whether the last code was a
+    # BEGIN or END which we can only make sense of given the next code.
+    depth = 0
+    pending = None
+    # The last significant token, and whether it's somewhere in a
+    # stretch we skipped over (which we only look through if we need to).
+    prev = None
+    skipped_from = None
+    begin_after = None
+    # Whether we've passed the end of a statement on this line.
+    at_statement_end = False
+    while pos < buff_len:
+        if not at_statement_end and not pending:
+            skip_end = skip.match(buff, pos).end()
+            if skip_end > pos:
+                if skipped_from is None:
+                    skipped_from = pos
+                pos = skip_end
+            if pos >= buff_len:
+                break
+        name, end = _match_token(buff, pos, combined, regexes, names)
+        if name is None or (name == "<unlexable>" and not complete):
+            # We can't tell where the statements are from here on.
+            break
+        if name == "newline":
+            if at_statement_end:
+                if prev_chunk is not None:
+                    yield prev_chunk
+                prev_chunk = buff[start:end]
+                start = end
+                at_statement_end = False
+        elif name == "whitespace" or name in comments:
+            if b"\n" in buff[pos:end]:
+                at_statement_end = False
+        else:
+            at_statement_end = False
+            token = buff[pos:end].upper()
+            if skipped_from is not None and token == b"BEGIN":
+                prev = last_token(skipped_from, pos)
+            skipped_from = None
+            after_end = pending == b"END"
+            if pending == b"BEGIN":
+                if (
+                    begin_after in _block_begin_after
+                    and name == "code"
+                    and token not in _not_block_keywords
+                ):
+                    depth += 1
+            elif pending == b"END":
+                if token not in _uncounted_end_keywords:
+                    depth = max(depth - 1, 0)
+            pending = None
+            if name == "code" and token in (b"BEGIN", b"END"):
+                pending = token
+                begin_after = prev
+            elif name == "code" and token == b"CASE" and not after_end:
+                # NB: END CASE closes the CASE, rather than opening another.
+                depth += 1
+            elif name == "semicolon":
+                if depth and end - start > max_block_size:
+                    # This is too long to be a block, so we must have
+                    # misread it.
+                    depth = 0
+                at_statement_end = not depth
+            prev = token
+        pos = end
+    remainder = buff[start:]
+    if prev_chunk is not None and not remainder.strip():
+        prev_chunk += remainder
+        remainder = b""
+    if prev_chunk is not None:
+        yield prev_chunk
+    if remainder:
+        yield remainder
+
+
+def iter_stream_statement_chunks(
+    stream, lexer_struct, read_size: int = 64 * 1024, **kwargs
+) -> Iterator[bytes]:
+    """Split a binary stream of sql into chunks, as `iter_statement_chunks`.
+
+    The stream (e.g. stdin) is read a block at a time, and each chunk is
+    returned as soon as it's known to be complete, so that only the
+    chunk which is being read needs to be held in memory.
+    """
+    buff = b""
+    size = read_size
+    while True:
+        block = stream.read(size)
+        if not block:
+            break
+        buff += block
+        chunks = list(
+            iter_statement_chunks(buff, lexer_struct, complete=False, **kwargs)
+        )
+        # All but the last chunk are complete. The last is split again
+        # with whatever is read next.
+        yield from chunks[:-1]
+        buff = chunks[-1] if chunks else b""
+        # If we couldn't split anything off, read more before trying
+        # again, so that we don't keep splitting the same long chunk.
+        size = read_size if len(chunks) > 1 else max(read_size, len(buff))
+    yield from iter_statement_chunks(buff, lexer_struct, **kwargs)
+
+
+def _match_token(buff, pos, combined, regexes, names) -> Tuple[Optional[str], int]:
+    """Match the next token of a buffer, as the `Lexer` would.
+
+    Returns:
+        :obj:`tuple` of (the name of the matcher, and the end of the
+        token), or (None, pos) if nothing matches.
+
+    """
+    start_idx = 0
+    match = combined.match(buff, pos)
+    if match:
+        idx = int(match.lastgroup[1:])
+        if match.end() > pos:
+            return names[idx], match.end()
+        # An empty match doesn't count, so carry on with the matchers after it.
+        start_idx = idx + 1
+    for idx in range(start_idx, len(regexes)):
+        match = regexes[idx].match(buff, pos)
+        if match and match.end() > pos:
+            return names[idx], match.end()
+    match = _last_resort_regex.match(buff, pos)
+    if match:
+        return "<unlexable>", match.end()
+    return None, pos
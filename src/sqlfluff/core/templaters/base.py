@@ -1,5 +1,6 @@
 """Defines the templaters."""
 
+import bisect
 import logging
 from typing import Dict, Iterator, List, Tuple, Optional, NamedTuple
 
@@ -118,6 +119,18 @@ class TemplatedFile:
         # Precalculate newlines, character positions.
         self._source_newlines = list(iter_indices_of_newlines(self.source_str))
         self._templated_newlines = list(iter_indices_of_newlines(self.templated_str))
+        # Precalculate the positions of the slices, so that we can bisect
+        # them rather than scanning from the start for each lookup.
+        self._templated_slice_stops = [
+            elem[2].stop for elem in self.sliced_file
+        ]
+        self._templated_slices_sorted = all(
+            a <= b
+            for a, b in zip(
+                self._templated_slice_stops, self._templated_slice_stops[1:]
+            )
+        )
+        self._raw_slice_idxs = [elem[2] for elem in self.raw_sliced]
 
     def __bool__(self):
         """Return true if there's a templated file."""
@@ -138,15 +151,14 @@ class TemplatedFile:
                 templated file)
 
         """
-        nl_idx = -1
-
         if source:
             ref_str = self._source_newlines
         else:
             ref_str = self._templated_newlines
 
-        while nl_idx + 1 < len(ref_str) and ref_str[nl_idx + 1] < char_pos:
-            nl_idx += 1
+        # The newline indices are sorted, so we can bisect to find
+        # the index of the last newline before this position.
+        nl_idx = bisect.bisect_left(ref_str, char_pos) - 1
 
         # NB: +1 because character position is 0-indexed, but the character
         # position is 1-indexed.
@@ -167,12 +179,18 @@ class TemplatedFile:
         """
         start_idx = start_idx or 0
         first_idx = None
+        if self._templated_slices_sorted:
+            # Skip straight to the first slice which ends after this point.
+            start_idx = bisect.bisect_left(
+                self._templated_slice_stops, templated_pos, lo=start_idx
+            )
         last_idx = start_idx
-        for idx, elem in enumerate(self.sliced_file[start_idx:]):
-            last_idx = idx + start_idx
+        for idx in range(start_idx, len(self.sliced_file)):
+            elem = self.sliced_file[idx]
+            last_idx = idx
             if elem[2].stop >= templated_pos:
                 if first_idx is None:
-                    first_idx = idx + start_idx
+                    first_idx = idx
                 if elem[2].start > templated_pos:
                     break
                 elif not inclusive and elem[2].start >= templated_pos:
@@ -314,20 +332,18 @@ class TemplatedFile:
         # Zero length slice. It's a literal, because it's definitely not templated.
         if source_slice.start == source_slice.stop:
             return True
-        is_literal = True
-        for _, seg_type, seg_idx in self.raw_sliced:
-            # Reset if we find a literal and we're up to the start
-            # otherwise set false.
-            if seg_idx <= source_slice.start:
-                is_literal = seg_type == "literal"
-            elif seg_idx >= source_slice.stop:
-                # We've gone past the end. Break and Return.
-                break
-            else:
-                # We're in the middle. Check type
-                if seg_type != "literal":
-                    is_literal = False
-        return is_literal
+        # The slice containing the start determines whether we start as
+        # a literal (if there is one).
+        start_idx = bisect.bisect_right(self._raw_slice_idxs, source_slice.start)
+        if start_idx and self.raw_sliced[start_idx - 1][1] != "literal":
+            return False
+        # Then any slice starting in the middle must also be literal.
+        stop_idx = bisect.bisect_left(
+            self._raw_slice_idxs, source_slice.stop, lo=start_idx
+        )
+        return all(
+            elem[1] == "literal" for elem in self.raw_sliced[start_idx:stop_idx]
+        )
 
     def source_only_slices(self) -> List[RawFileSlice]:
         """Return a list a slices which reference the parts only in the source.
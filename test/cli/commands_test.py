@@ -135,6 +135,7 @@ def test__cli__command_lint_stdin(command):
         # Check the profiler and benching commands
         (parse, ["-n", "test/fixtures/cli/passing_b.sql", "--profiler"]),
         (parse, ["-n", "test/fixtures/cli/passing_b.sql", "--bench"]),
+        (parse, ["-n", "test/fixtures/cli/passing_b.sql", "--profile-grammar"]),
         # Check linting works in specifying rules
         (lint, ["-n", "--rules", "L001", "test/fixtures/linter/operator_errors.sql"]),
         # Check linting works in specifying multiple rules
@@ -405,6 +406,109 @@ def test__cli__command_parse_serialize_from_stdin(serialize):
     assert result["filepath"] == "stdin"
 
 
+@pytest.mark.parametrize("serialize", ["yaml", "json"])
+def test__cli__command_parse_serialize_stream(serialize):
+    """Check that streamed output has one record per statement."""
+    result = invoke_assert_code(
+        args=[
+            parse,
+            (
+                "test/fixtures/cli",
+                "--format",
+                serialize,
+                "--stream",
+                "--templater",
+                "raw",
+            ),
+        ],
+    )
+    if serialize == "json":
+        records = [json.loads(line) for line in result.output.splitlines()]
+    else:
+        records = list(yaml.safe_load_all(result.output))
+    assert [record["filepath"] for record in records] == [
+        "test/fixtures/cli/fail_many.sql",
+        "test/fixtures/cli/passing_a.sql",
+        "test/fixtures/cli/passing_b.sql",
+    ]
+    assert all(record["segments"]["file"] for record in records)
+
+
+def test__cli__command_parse_stream_stdin():
+    """Check that streaming from stdin parses one statement at a time."""
+    result = invoke_assert_code(
+        args=[parse, ("-", "--format", "json", "--stream", "--templater", "raw")],
+        cli_input="select 1;\nselect 2;\n",
+    )
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [
+        record["segments"]["file"]["statement_terminator"] for record in records
+    ] == [";", ";"]
+
+
+def test__cli__command_parse_stream_templated():
+    """Check that we warn when files can't be streamed by statement."""
+    result = invoke_assert_code(
+        args=[parse, ("-", "--format", "json", "--stream")],
+        cli_input="select 1;\nselect 2;\n",
+    )
+    # NB: The warning goes to stderr, which may or may not be in the output.
+    assert "each file will be parsed whole" in result.output
+    records = [
+        json.loads(line) for line in result.output.splitlines() if line.startswith("{")
+    ]
+    assert len(records) == 1
+
+
+def test__cli__command_parse_profile_grammar_json():
+    """Check the grammar profile can be output as json."""
+    try:
+        runner = CliRunner(mix_stderr=False)
+    except TypeError:  # pragma: no cover
+        # Newer versions of click always keep stderr separate.
+        runner = CliRunner()
+    result = runner.invoke(
+        parse,
+        [
+            "-",
+            "--format",
+            "json",
+            "--profile-grammar",
+            "--profile-grammar-format",
+            "json",
+        ],
+        input="select * from tbl",
+    )
+    assert result.exit_code == 0
+    # The parse output and the profile (on stderr) are separate.
+    parsed = json.loads(result.stdout)
+    assert parsed[0]["filepath"] == "stdin"
+    profile = json.loads(result.stderr)
+    assert {"segment", "ref", "grammar"} >= {r["kind"] for r in profile}
+    assert any(r["name"] == "SelectStatementSegment" for r in profile)
+
+
+def test__cli__command_lint_rule_timings():
+    """Check the table of rule timings is output after the results."""
+    result = invoke_assert_code(
+        ret_code=65,
+        args=[
+            lint,
+            (
+                "test/fixtures/linter/indentation_error_simple.sql",
+                "--rules",
+                "L003,L010",
+                "--rule-timings",
+            ),
+        ],
+    )
+    table = result.output.split("==== rule timings ====\n")[1].strip().splitlines()
+    assert table[0].split() == ["rule", "time", "evals", "violations", "fixes"]
+    assert sorted(row.split()[0] for row in table[1:]) == ["L003", "L010"]
+    # The number of violations for each rule.
+    assert {row.split()[3] for row in table[1:]} == {"1"}
+
+
 @pytest.mark.parametrize("serialize", ["yaml", "json"])
 @pytest.mark.parametrize(
     "sql,expected,exit_code",
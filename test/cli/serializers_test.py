@@ -0,0 +1,54 @@
+"""The Test file for the streaming serializers of the CLI."""
+
+import json
+
+import oyaml as yaml
+import pytest
+
+from sqlfluff.core import Linter
+from sqlfluff.cli.serializers import (
+    RecordDumper,
+    iter_parse_record_events,
+    iter_json_chunks,
+    iter_yaml_chunks,
+)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT a ,b FROM tbl -- A comment\n",
+        "SELECT\n\t'it''s', \"é\"\nFROM tbl\n",
+        "{% set cols = ['a', 'b'] %}\nselect\n{% for col in cols %}\n"
+        "    {{ col }} as {{ col }}_alias,\n{% endfor %}\n    c\nfrom tbl\n",
+        "SELECT * FROM tbl WHERE ??? ;\n",
+    ],
+)
+@pytest.mark.parametrize("code_only", [False, True])
+def test__cli__serializers_match_dump(sql, code_only):
+    """Test the streamed output matches dumping the whole record."""
+    parsed = Linter().parse_string(sql, fname="foo.sql")
+
+    def make_record():
+        return dict(
+            filepath="foo.sql",
+            segments=parsed.tree.as_record(code_only=code_only, show_raw=True),
+        )
+
+    record = make_record()
+
+    def events():
+        return iter_parse_record_events(parsed, code_only=code_only)
+
+    assert "".join(iter_json_chunks(events())) == json.dumps(record)
+    assert "".join(iter_yaml_chunks(events(), explicit_start=True)) == yaml.dump(
+        record, Dumper=RecordDumper, explicit_start=True
+    )
+    # And the same for a list of records. NB: A separate copy of the
+    # record, so yaml doesn't use an alias for the second one.
+    records = [record, make_record()]
+    events_list = [("seq_start", None), *events(), *events(), ("seq_end", None)]
+    assert "".join(iter_json_chunks(events_list)) == json.dumps(records)
+    assert "".join(iter_yaml_chunks(events_list)) == yaml.dump(
+        records, Dumper=RecordDumper
+    )
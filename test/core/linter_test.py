@@ -6,6 +6,8 @@ from unittest.mock import patch
 from sqlfluff.core import Linter, FluffConfig
 from sqlfluff.core.errors import SQLLintError, SQLParseError
 from sqlfluff.core.linter import LintingResult
+from sqlfluff.core.parser import BaseSegment, Lexer
+from sqlfluff.core.rules.parallel import ParallelCrawler
 
 
 def normalise_paths(paths):
@@ -129,6 +131,10 @@ def test__linter__linting_result__sum_dicts():
     assert lr.sum_dicts(a, b) == r
     # Check the identity too
     assert lr.sum_dicts(r, i) == r
+    # Nested dicts are summed too.
+    assert lr.sum_dicts(dict(r=dict(a=1)), dict(r=dict(a=2, b=3), c=4)) == dict(
+        r=dict(a=3, b=3), c=4
+    )
 
 
 def test__linter__linting_result__combine_dicts():
@@ -201,3 +207,240 @@ def test__linter__empty_file():
     # Make sure no exceptions raised and no violations found in empty file.
     parsed = lntr.parse_string("")
     assert not parsed.violations
+
+
+def test__linter__lexer_and_parser_cached():
+    """Test that lexers and parsers are reused between files of the same dialect."""
+    lntr = Linter()
+    with patch("sqlfluff.core.linter.Lexer", wraps=Lexer) as patched_lexer:
+        lntr.parse_string("select a from b\n")
+        lntr.parse_string("select c from d\n")
+    assert patched_lexer.call_count == 1
+    assert lntr.get_parser() is lntr.get_parser()
+    # A different dialect gets a different lexer and parser.
+    other_cfg = FluffConfig(overrides=dict(dialect="bigquery"))
+    assert lntr.get_lexer(other_cfg) is not lntr.get_lexer()
+    assert lntr.get_parser(other_cfg) is not lntr.get_parser()
+    # A change in indentation config means a new parser.
+    indent_cfg = FluffConfig(
+        configs={"indentation": {"indented_joins": True}},
+    )
+    assert lntr.get_parser(indent_cfg) is not lntr.get_parser()
+
+
+def test__linter__large_file(tmpdir):
+    """Test that large files are linted one statement at a time."""
+    fpath = str(tmpdir.join("large.sql"))
+    with open(fpath, "w") as f:
+        f.write("select a,b from tbl; select c,d from tbl;\nselect e,f\nfrom tbl;\n")
+    results = {}
+    for threshold in (0, 1):
+        lntr = Linter(
+            config=FluffConfig(
+                overrides=dict(
+                    templater="raw", rules="L008", large_file_threshold=threshold
+                )
+            )
+        )
+        assert lntr.is_large_file(fpath) == bool(threshold)
+        linted = lntr.lint_path(fpath)
+        results[threshold] = sorted(linted.check_tuples())
+        parsed = [p.tree.raw for p in lntr.parse_path(fpath)]
+        # Any file can be parsed one statement at a time if we ask.
+        assert len(list(lntr.parse_path(fpath, by_statement=True))) == 2
+        if threshold:
+            # There's no tree for large files, but violations are positioned
+            # within the whole file.
+            assert linted.tree is None
+            # Nor do the segments of the violations keep their trees.
+            assert not any(
+                getattr(v.segment, "_cache_type_index", None)
+                for v in linted.files[0].violations
+            )
+            assert parsed == [
+                "select a,b from tbl; select c,d from tbl;\n",
+                "select e,f\nfrom tbl;\n",
+            ]
+    expected = [("L008", 1, 10), ("L008", 1, 31), ("L008", 2, 10)]
+    assert results[0] == results[1] == expected
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        # Statements which share a line, with nothing wrong with them.
+        "select a from tbl; select b from tbl;\nselect c\nfrom tbl;\n",
+        # Without a newline at the end.
+        "select a from tbl;\nselect b from tbl;",
+        # With an indented statement, and a noqa comment.
+        "select a from tbl;\n    select b from tbl;\nselect c,d from tbl; -- noqa\n",
+    ],
+)
+def test__linter__large_file_same_results(sql, tmpdir):
+    """Test linting one statement at a time gets the same results.
+
+    In particular for rules which need to know where the file starts
+    and ends, like L003 and L009.
+    """
+    fpath = str(tmpdir.join("large.sql"))
+    with open(fpath, "w") as f:
+        f.write(sql)
+    results = []
+    for threshold in (0, 1):
+        lntr = Linter(
+            config=FluffConfig(
+                overrides=dict(templater="raw", large_file_threshold=threshold)
+            )
+        )
+        results.append(sorted(lntr.lint_path(fpath).check_tuples()))
+    assert results[0] == results[1]
+
+
+def test__linter__large_file_not_split(tmpdir):
+    """Test dialects with their own statement terminators aren't split."""
+    fpath = str(tmpdir.join("large.sql"))
+    with open(fpath, "w") as f:
+        f.write("select 1;\nselect 2;\n")
+    lntr = Linter(
+        config=FluffConfig(
+            overrides=dict(templater="raw", large_file_threshold=1, dialect="exasol_fs")
+        )
+    )
+    assert not lntr.is_large_file(fpath)
+    lntr = Linter(
+        config=FluffConfig(
+            overrides=dict(templater="raw", large_file_threshold=1, dialect="exasol")
+        )
+    )
+    assert lntr.is_large_file(fpath)
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT a ,b  FROM tbl\n  join foo using(a) -- A comment\n",
+        "SELECT * FROM tbl WHERE ??? ;\n",
+    ],
+)
+def test__linter__rule_processes(sql):
+    """Test splitting the rules between processes gives the same results."""
+    results = []
+    evals = []
+    for processes in (1, 2, 3):
+        lntr = Linter(config=FluffConfig(overrides=dict(rule_processes=processes)))
+        linted = lntr.lint_string(sql)
+        evals.append(
+            tuple(
+                (code, timings["evals"])
+                for code, timings in sorted(linted.time_dict["rules"].items())
+            )
+        )
+        results.append(
+            [
+                (
+                    v.get_info_dict(),
+                    [
+                        (f.edit_type, f.anchor.raw, [s.raw for s in f.edit or []])
+                        for f in getattr(v, "fixes", [])
+                    ],
+                )
+                for v in linted.violations
+            ]
+        )
+    assert results[0]
+    assert results[0] == results[1] == results[2]
+    # The rules in the workers are counted too.
+    assert len(set(evals)) == 1
+
+
+def parallel_crawl_results(tree, processes):
+    """Crawl a tree with the default rules split between processes."""
+    lntr = Linter()
+    dialect = lntr.config.get("dialect_obj")
+    results = ParallelCrawler(lntr.get_ruleset(), processes).crawl(tree, dialect)
+    return [
+        [(v.rule_code(), v.segment.pos_marker.char_pos) for v in vs]
+        for vs, _ in results
+    ]
+
+
+def test__linter__rule_processes_unserializable():
+    """Test a tree which can't be serialized is crawled in one process."""
+
+    class Mixin:
+        pass
+
+    class UnserializableSegment(BaseSegment, Mixin):
+        type = "unserializable"
+
+    parsed = Linter().parse_string("SELECT a ,b  FROM tbl\n").tree
+    tree = UnserializableSegment(segments=parsed.segments, pos_marker=parsed.pos_marker)
+    results = parallel_crawl_results(tree, 2)
+    assert any(results)
+    assert results == parallel_crawl_results(tree, 1)
+
+
+def test__linter__rule_processes_indexed():
+    """Test the index of a tree is reused when crawling part of it."""
+    tree = Linter().parse_string("SELECT a ,b  FROM tbl;\nSELECT c  FROM tbl;\n").tree
+    index = tree.index_types()
+    statement = [seg for seg in tree.segments if seg.is_type("statement")][1]
+    results = parallel_crawl_results(statement, 2)
+    assert any(results)
+    assert statement._cache_type_index[0] is index
+    tree.clear_type_index()
+    assert results == parallel_crawl_results(statement, 1)
+
+
+def test__linter__rule_processes_pool(tmpdir):
+    """Test the worker processes are reused between files, then shut down."""
+    lntr = Linter(config=FluffConfig(overrides=dict(rule_processes=2)))
+    lntr.lint_string("SELECT a ,b  FROM tbl\n")
+    pool = lntr._rule_pool
+    assert pool is not None
+    lntr.lint_string("SELECT c  FROM tbl\n")
+    assert lntr._rule_pool is pool
+    # More workers need a new pool.
+    assert lntr.get_rule_pool(3) is not pool
+    assert lntr._rule_pool_workers == 2
+    for idx in range(2):
+        with open(str(tmpdir.join(f"{idx}.sql")), "w") as f:
+            f.write("SELECT a ,b  FROM tbl\n")
+    result = lntr.lint_paths((str(tmpdir),))
+    assert len(result.paths[0].files) == 2
+    assert lntr._rule_pool is None
+
+
+def test__linter__rule_timings():
+    """Test the timings and counters for each rule are recorded."""
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L009,L010,L014")))
+    linted = lntr.lint_string("SELECT a from tbl")
+    rules = linted.time_dict["rules"]
+    assert sorted(rules) == ["L009", "L010", "L014"]
+    # L009 is only evaluated on raw segments, and the others on everything.
+    assert 0 < rules["L009"]["evals"] < rules["L010"]["evals"]
+    assert rules["L010"]["evals"] == rules["L014"]["evals"]
+    assert all(timings["time"] >= 0 for timings in rules.values())
+    assert [
+        (code, rules[code]["violations"], rules[code]["fixes"]) for code in rules
+    ] == [
+        ("L009", 1, 1),
+        ("L010", 1, 1),
+        ("L014", 0, 0),
+    ]
+    assert "fix_loops" not in linted.time_dict
+
+    fixed = lntr.lint_string("SELECT a from tbl", fix=True)
+    # The first loop fixes both violations, and the second finds none,
+    # but the rules are evaluated on both (and L009 adds a newline).
+    assert fixed.time_dict["fix_loops"] == 2
+    assert fixed.time_dict["rules"]["L010"]["violations"] == 1
+    assert fixed.time_dict["rules"]["L010"]["evals"] > 2 * rules["L010"]["evals"]
+
+    # The timings are summed over the files in the stats.
+    result = LintingResult()
+    result.add(lntr.lint_paths(("test/fixtures/linter/operator_errors.sql",)).paths[0])
+    result.paths[0].add(fixed)
+    stats = result.stats()
+    assert stats["fix_loops"] == 2
+    assert stats["rules"]["L010"]["evals"] > fixed.time_dict["rules"]["L010"]["evals"]
@@ -125,6 +125,37 @@ def test__parser__lexer_multimatcher(caplog):
         assert res.segments[2].raw == "#..#"
 
 
+def test__parser__lexer_multimatcher_empty_match():
+    """Test that an empty match doesn't stop later submatchers matching."""
+    matcher = RepeatedMultiMatcher(
+        RegexMatcher("maybe", r"a*", RawSegment.make("maybe", name="maybe")),
+        SingletonMatcher("dot", ".", RawSegment.make(".", name="dot", is_code=True)),
+    )
+    res = matcher.match("aa.a.#", FilePositionMarker())
+    assert [seg.raw for seg in res.segments] == ["aa", ".", "a", "."]
+    assert res.new_string == "#"
+
+
+def test__parser__lexer_subdivide_classes_reused():
+    """Test that subdivided segments reuse the classes made on construction."""
+    lex = Lexer(config=FluffConfig())
+    segments, _ = lex.lex("/* a\n b */ /* c\n d */")
+    assert [seg.raw for seg in segments] == [
+        "/* a",
+        "\n",
+        " ",
+        "b */",
+        " ",
+        "/* c",
+        "\n",
+        " ",
+        "d */",
+    ]
+    # Both newlines and both trimmed whitespace segments share a class.
+    assert type(segments[1]) is type(segments[6])
+    assert type(segments[2]) is type(segments[7])
+
+
 def test__parser__lexer_fail():
     """Test the how the lexer fails and reports errors."""
     lex = Lexer(config=FluffConfig())
@@ -18,6 +18,10 @@ def test__markers__common_marker():
     assert fp2 == FilePositionMarker(1, 1, 4, 3)
     assert fp3 == FilePositionMarker(1, 3, 4, 14)
     assert fp4 == FilePositionMarker(2, 3, 7, 17)
+    # Check advance works when ending with a newline
+    assert fp2.advance_by("d\n") == FilePositionMarker(1, 2, 1, 5)
+    # Check advancing by nothing doesn't move
+    assert fp2.advance_by("") == fp2
 
 
 def test__markers__common_marker_format():
@@ -41,3 +45,29 @@ def test__markers__enriched_marker_format():
     )
     # Check Formatting Style
     assert str(fp1) == "[0](1, 2, 3)"
+
+
+def test__markers__offset_by():
+    """Test offsetting markers to the start of a piece of a file."""
+    start_pos = FilePositionMarker(1, 3, 5, 20)
+    # On the first line, the line position is offset.
+    assert FilePositionMarker(1, 1, 2, 1).offset_by(start_pos) == FilePositionMarker(
+        1, 3, 6, 21
+    )
+    # On later lines it isn't.
+    assert FilePositionMarker(1, 2, 2, 8).offset_by(start_pos) == FilePositionMarker(
+        1, 4, 2, 28
+    )
+    enriched = EnrichedFilePositionMarker(
+        1,
+        1,
+        2,
+        1,
+        slice(1, 3),
+        slice(1, 3),
+        True,
+        source_pos_marker=FilePositionMarker(1, 1, 2, 1),
+    ).offset_by(start_pos)
+    assert enriched.templated_slice == slice(21, 23)
+    assert enriched.source_slice == slice(21, 23)
+    assert str(enriched) == "[21](1, 3, 6)"
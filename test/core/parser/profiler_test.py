@@ -0,0 +1,74 @@
+"""The Test file for the grammar profiler."""
+
+import pytest
+
+from sqlfluff.core import Linter
+from sqlfluff.core.parser import ParseProfiler
+from sqlfluff.core.parser.profiler import profile_key
+from sqlfluff.core.parser.grammar import Ref, Sequence
+from sqlfluff.core.parser.segments import BaseSegment
+
+
+def test__parser__profiler_profile_key():
+    """Test the names which matchers are profiled under."""
+
+    class FooSegment(BaseSegment):
+        """A dummy segment for profiling."""
+
+    assert profile_key(FooSegment) == ("segment", "FooSegment")
+    assert profile_key(Ref("BarGrammar")) == ("ref", "BarGrammar")
+    assert profile_key(Sequence("bar")) == ("grammar", "Sequence")
+
+
+def test__parser__profiler_self_time():
+    """Test self time excludes time spent in nested calls."""
+    profiler = ParseProfiler()
+    outer = Ref("Outer")
+    inner = Ref("Inner")
+    profiler.start(outer)
+    profiler.start(inner)
+    profiler.record_memo(hit=True)
+    profiler.stop(("a", "b"), ("a",))
+    profiler.record_memo(hit=False)
+    profiler.stop(("a", "b", "c"))
+    records = {r.name: r for r in profiler.records()}
+    assert records["Inner"].memo_hits == 1
+    assert records["Outer"].memo_misses == 1
+    assert records["Inner"].tokens_attempted == 2
+    assert records["Inner"].tokens_matched == 1
+    assert records["Outer"].tokens_matched == 0
+    assert records["Outer"].cumulative_time >= records["Inner"].cumulative_time
+    assert records["Outer"].self_time <= records["Outer"].cumulative_time
+
+
+def test__parser__profiler_recursion():
+    """Test that recursive calls only count cumulative time once."""
+    profiler = ParseProfiler()
+    ref = Ref("Recursive")
+    profiler.start(ref)
+    profiler.start(ref)
+    profiler.stop(())
+    profiler.stop(())
+    (record,) = profiler.records()
+    assert record.calls == 2
+    # Self time is the total time, because all the time is within this record.
+    assert record.cumulative_time == pytest.approx(record.self_time)
+
+
+def test__parser__profiler_bad_sort():
+    """Test that sorting by an unknown field raises."""
+    with pytest.raises(ValueError):
+        ParseProfiler().records(sort_by="foo")
+
+
+def test__parser__profiler_parse_string():
+    """Test that profiling a parse records the segments used."""
+    profiler = ParseProfiler()
+    parsed = Linter().parse_string("select a from b\n", profiler=profiler)
+    assert parsed.tree
+    records = profiler.as_records()
+    names = {(r["kind"], r["name"]) for r in records}
+    assert ("segment", "SelectStatementSegment") in names
+    # Records are ranked by self time.
+    self_times = [r["self_time"] for r in records]
+    assert self_times == sorted(self_times, reverse=True)
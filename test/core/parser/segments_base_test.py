@@ -8,6 +8,7 @@ from sqlfluff.core.parser import (
     BaseSegment,
 )
 from sqlfluff.core.parser.context import RootParseContext
+from sqlfluff.core.rules.base import LintFix
 from sqlfluff.core.dialects import ansi_dialect
 
 
@@ -41,6 +42,22 @@ def test__parser__base_segments_raw_init():
     RawSegment("foobar", FilePositionMarker())
 
 
+def test__parser__base_segments_raw_slots():
+    """Test raw segments (including made ones) don't carry a __dict__."""
+    assert not hasattr(RawSegment("foobar", FilePositionMarker()), "__dict__")
+    made = RawSegment.make("foo", name="foo")
+    assert not hasattr(made("foo", FilePositionMarker()), "__dict__")
+    assert not hasattr(FilePositionMarker(), "__dict__")
+
+
+def test__parser__base_segments_raw_interned():
+    """Test repeated raw strings are shared between segments."""
+    seg_a = RawSegment("".join(["se", "lect"]), FilePositionMarker())
+    seg_b = RawSegment("".join(["sel", "ect"]), FilePositionMarker())
+    assert seg_a.raw is seg_b.raw
+    assert seg_a.raw_upper is seg_b.raw_upper == "SELECT"
+
+
 def test__parser__base_segments_type():
     """Test the .is_type() method."""
     assert BaseSegment.is_type("base")
@@ -49,6 +66,12 @@ def test__parser__base_segments_type():
     assert DummySegment.is_type("dummy")
     assert DummySegment.is_type("base")
     assert DummySegment.is_type("base", "foo", "bar")
+    # Classes generated with make() also know their parent types.
+    made = RawSegment.make("foo", name="foo", type="made")
+    assert made.is_type("made")
+    assert made.is_type("raw")
+    assert made.is_type("base")
+    assert not made.is_type("dummy")
 
 
 def test__parser__base_segments_raw(raw_seg):
@@ -92,6 +115,114 @@ def test__parser__base_segments_base(raw_seg_list):
     )
 
 
+def test__parser__base_segments_iter_record_events(raw_seg_list):
+    """Test the record events mirror the structure of as_record."""
+    base_seg = DummySegment(raw_seg_list)
+    assert base_seg.as_record(show_raw=True) == {
+        "dummy": [{"raw": "foobar"}, {"raw": ".barfoo"}]
+    }
+    assert list(base_seg.iter_record_events(show_raw=True)) == [
+        ("map_start", None),
+        ("scalar", "dummy"),
+        ("seq_start", None),
+        ("map_start", None),
+        ("scalar", "raw"),
+        ("scalar", "foobar"),
+        ("map_end", None),
+        ("map_start", None),
+        ("scalar", "raw"),
+        ("scalar", ".barfoo"),
+        ("map_end", None),
+        ("seq_end", None),
+        ("map_end", None),
+    ]
+    # Without the raw, each raw segment is an empty list.
+    assert list(DummySegment(raw_seg_list[:1]).iter_record_events()) == [
+        ("map_start", None),
+        ("scalar", "dummy"),
+        ("map_start", None),
+        ("scalar", "raw"),
+        ("seq_start", None),
+        ("seq_end", None),
+        ("map_end", None),
+        ("map_end", None),
+    ]
+
+
+def test__parser__base_segments_index_types():
+    """Test recursive_crawl and path_to give the same results from a type index."""
+    fp = FilePositionMarker()
+    raws = []
+    for raw in ("a", "b", "c"):
+        raws.append(RawSegment(raw, fp))
+        fp = fp.advance_by(raw)
+    inner = DummySegment([raws[1]])
+    aux = DummyAuxSegment([raws[0], inner])
+    tree = DummySegment([aux, raws[2]])
+    queries = [("raw",), ("dummy",), ("dummy_aux",), ("dummy", "raw"), ("foo",)]
+    expected = [
+        (seg, query, list(seg.recursive_crawl(*query)))
+        for seg in (tree, aux)
+        for query in queries
+    ]
+    tree.index_types()
+    for seg, query, result in expected:
+        assert list(seg.recursive_crawl(*query)) == result
+    assert [s.raw for s in aux.recursive_crawl("raw")] == ["a", "b"]
+    # We can also find paths and parents from the index.
+    assert tree._indexed_path_to(raws[1]) == [tree, aux, inner, raws[1]]
+    assert tree.path_to(raws[1]) == [tree, aux, inner, raws[1]]
+    assert aux.path_to(raws[1]) == [aux, inner, raws[1]]
+    assert aux._indexed_path_to(raws[2]) is None
+    # Once cleared, no segment refers to the index, which is emptied, but
+    # we still get the same results by walking the tree.
+    index = raws[0]._cache_type_index[0]
+    aux.clear_type_index()
+    assert not index.segments
+    assert not any(seg._cache_type_index for seg in [tree, aux, inner] + raws)
+    for seg, query, result in expected:
+        assert list(seg.recursive_crawl(*query)) == result
+
+
+def test__parser__base_segments_realign_keeps_raw(raw_seg_list):
+    """Test realigning a segment carries over its cached raw."""
+    base_seg = DummySegment(raw_seg_list)
+    raw = base_seg.raw
+    realigned = base_seg.realign()
+    assert realigned is not base_seg
+    # The raw is carried over, rather than being rebuilt.
+    assert realigned._cache_raw is raw
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test__parser__base_segments_apply_fixes(indexed):
+    """Test applying fixes, with and without a type index."""
+    fp = FilePositionMarker()
+    raws = []
+    for raw in ("a", "b", "c"):
+        raws.append(RawSegment(raw, fp))
+        fp = fp.advance_by(raw)
+    tree = DummySegment([DummyAuxSegment([raws[0], DummySegment([raws[1]])]), raws[2]])
+    if indexed:
+        tree.index_types()
+    fixes = [
+        LintFix("delete", raws[0]),
+        LintFix("edit", raws[1], RawSegment("x", raws[1].pos_marker)),
+        LintFix("create", raws[2], RawSegment("y", raws[2].pos_marker)),
+        # Fixes without an anchor (as some rules make) are left unused.
+        LintFix("delete", None),
+    ]
+    fixed, unused = tree.apply_fixes(fixes)
+    assert unused == fixes[3:]
+    assert fixed.raw == "xyc"
+    assert fixed.to_tuple() == (
+        "dummy",
+        (("dummy_aux", (("dummy", (("raw", ()),)),)), ("raw", ()), ("raw", ())),
+    )
+    # The original tree is untouched.
+    assert tree.raw == "abc"
+
+
 def test__parser__base_segments_raw_compare():
     """Test comparison of raw segments."""
     rs1 = RawSegment("foobar", FilePositionMarker())
@@ -0,0 +1,74 @@
+"""The Test file for the binary serialization of parse trees."""
+
+import pytest
+
+from sqlfluff.core import Linter, FluffConfig
+from sqlfluff.core.linter import ParsedString
+from sqlfluff.core.dialects import dialect_selector
+from sqlfluff.core.parser import dump_tree, load_tree
+from sqlfluff.core.parser.serialize import MAGIC
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT a ,b FROM tbl -- A comment\n",
+        "{% set cols = ['a', 'b'] %}\nselect\n{% for col in cols %}\n"
+        "    {{ col }} as {{ col }}_alias,\n{% endfor %}\n    c\nfrom tbl\n",
+        "SELECT * FROM tbl WHERE ??? ;\n",
+    ],
+)
+def test__parser__serialize_round_trip(sql):
+    """Test a loaded tree behaves as the original for linting and fixing."""
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L001,L003,L039")))
+    parsed = lntr.parse_string(sql)
+    dialect = lntr.config.get("dialect_obj")
+    data = dump_tree(parsed.tree, dialect, parsed.templated_file)
+    assert data.startswith(MAGIC)
+    tree, templated_file = load_tree(data, dialect)
+
+    assert tree.to_tuple(show_raw=True) == parsed.tree.to_tuple(show_raw=True)
+    assert tree.stringify() == parsed.tree.stringify()
+    # Classes which were made on the fly are made again when loading.
+    assert [repr(type(seg)) for seg in tree.iter_raw_seg()] == [
+        repr(type(seg)) for seg in parsed.tree.iter_raw_seg()
+    ]
+    assert templated_file.source_str == parsed.templated_file.source_str
+    assert templated_file.templated_str == parsed.templated_file.templated_str
+
+    loaded = ParsedString(
+        tree, list(parsed.violations), {}, templated_file, lntr.config, None
+    )
+    original = lntr.lint_parsed(parsed, None, fix=True)
+    reloaded = lntr.lint_parsed(loaded, None, fix=True)
+    assert [v.get_info_dict() for v in reloaded.violations] == [
+        v.get_info_dict() for v in original.violations
+    ]
+    assert reloaded.fix_string() == original.fix_string()
+
+
+def test__parser__serialize_fixed_tree():
+    """Test a tree with edited segments, which aren't in the templated file."""
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L010")))
+    parsed = lntr.parse_string("SELECT a from tbl\n")
+    dialect = lntr.config.get("dialect_obj")
+    fixed, _ = lntr.fix(parsed.tree)
+    assert fixed.raw == "SELECT a FROM tbl\n"
+    # Both with and without the templated file.
+    for templated_file in (parsed.templated_file, None):
+        tree, _ = load_tree(dump_tree(fixed, dialect, templated_file), dialect)
+        assert tree.to_tuple(show_raw=True) == fixed.to_tuple(show_raw=True)
+
+
+def test__parser__serialize_errors():
+    """Test loading bad data or with the wrong dialect."""
+    lntr = Linter()
+    parsed = lntr.parse_string("select a from tbl\n")
+    ansi = lntr.config.get("dialect_obj")
+    data = dump_tree(parsed.tree, ansi)
+    with pytest.raises(ValueError, match="not a serialized"):
+        load_tree(b"foo", ansi)
+    with pytest.raises(ValueError, match="version"):
+        load_tree(MAGIC + b"\xff\xff" + data[len(MAGIC) + 2 :], ansi)
+    with pytest.raises(ValueError, match="dialect"):
+        load_tree(data, dialect_selector("bigquery"))
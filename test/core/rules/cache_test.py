@@ -0,0 +1,154 @@
+"""Tests for caching the results of rules on repeated statements."""
+
+import copy
+
+import pytest
+
+from sqlfluff.cli.formatters import format_rule_timings
+from sqlfluff.core import Linter, FluffConfig
+from sqlfluff.core.rules.cache import StatementCache
+
+
+def lint_results(sql, **overrides):
+    """Lint a string, returning the linter and the violations as tuples."""
+    lntr = Linter(config=FluffConfig(overrides=overrides))
+    linted = lntr.lint_string(sql)
+    return (
+        lntr,
+        [
+            (
+                v.get_info_dict(),
+                [
+                    (f.edit_type, f.anchor.pos_marker, [s.raw for s in f.edit or []])
+                    for f in getattr(v, "fixes", [])
+                ],
+            )
+            for v in linted.violations
+        ],
+    )
+
+
+# With only statement local rules, the statements are skipped entirely.
+@pytest.mark.parametrize("rules", [None, "L001,L006,L008"])
+@pytest.mark.parametrize(
+    "sql",
+    [
+        # The same statement, at different positions and indents.
+        "SELECT a,b  FROM tbl ;  SELECT a,b  FROM tbl;\n"
+        "    SELECT a,b  FROM tbl\n;\nselect a,b  FROM tbl;\n",
+        # With some unparsable statements.
+        "SELECT * FROM tbl WHERE ??? ;\nSELECT * FROM tbl WHERE ??? ;\n",
+        # Repeated subqueries and CTEs within different statements (which
+        # aren't cached, because they're not top-level statements).
+        "WITH cte AS (select a+b from tbl) SELECT * FROM cte;\n"
+        "WITH cte AS (select a+b from tbl)  SELECT *  FROM cte;\n"
+        "SELECT * FROM (select a+b from tbl);\n",
+    ],
+)
+def test__rules__cache_same_results(sql, rules):
+    """Test caching the results of statements doesn't change them."""
+    _, uncached = lint_results(sql, rules=rules, cache_statements=False)
+    lntr, cached = lint_results(sql, rules=rules, cache_statements=True)
+    assert cached == uncached
+    # Linting again reuses the results for every statement.
+    hits = lntr._statement_cache.hits
+    misses = lntr._statement_cache.misses
+    linted = lntr.lint_string(sql)
+    assert lntr._statement_cache.misses == misses
+    assert lntr._statement_cache.hits > hits
+    assert [v.get_info_dict() for v in linted.violations] == [v for v, _ in uncached]
+
+
+def test__rules__cache_skips_statements():
+    """Test only statement local rules skip the statements they've seen."""
+    sql = "SELECT a+b FROM tbl;\nSELECT a+b FROM tbl;\n"
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L006,L010")))
+    rules = lntr.lint_string(sql).time_dict["rules"]
+    single = (
+        Linter(config=FluffConfig(overrides=dict(rules="L006,L010")))
+        .lint_string("SELECT a+b FROM tbl;\n")
+        .time_dict["rules"]
+    )
+    # L006 is only evaluated on the first statement (and between them).
+    assert rules["L006"]["evals"] < 2 * single["L006"]["evals"]
+    # L010 needs the context of the file, so sees both.
+    assert rules["L010"]["evals"] > single["L010"]["evals"]
+
+
+def test__rules__cache_statement_key():
+    """Test statements are cached by their structure and the dialect."""
+    lntr = Linter()
+    ansi = lntr.config.get("dialect_obj")
+    bigquery = Linter(dialect="bigquery").config.get("dialect_obj")
+    tree = lntr.parse_string(
+        "select a from b;\nselect a  from b;\nselect a from b;\n"
+    ).tree
+    # Statements can only be cached once their tree has been indexed.
+    first = tree.segments[0]
+    assert StatementCache.statement_key(first, ansi) is None
+    tree.index_types()
+    statements = [seg for seg in tree.segments if seg.is_type("statement")]
+    keys = [StatementCache.statement_key(seg, ansi) for seg in statements]
+    assert keys[0] == keys[2] != keys[1]
+    assert StatementCache.statement_key(statements[0], bigquery) != keys[0]
+
+
+def test__rules__cache_max_size():
+    """Test the least recently used results are evicted from the cache."""
+    lntr = Linter(
+        config=FluffConfig(overrides=dict(rules="L006", cache_statements_max_size=2))
+    )
+    cache = lntr._statement_cache
+    lntr.lint_string(
+        "SELECT a+b FROM tbl;\nSELECT c+d FROM tbl;\nSELECT e+f FROM tbl;\n"
+    )
+    assert (cache.hits, cache.misses) == (0, 3)
+    assert len(cache._results) == 2
+
+    def lint_counts(sql):
+        hits, misses = cache.hits, cache.misses
+        violations = lntr.lint_string(sql).violations
+        assert [v.rule_code() for v in violations] == ["L006", "L006"]
+        return cache.hits - hits, cache.misses - misses
+
+    # The last two statements are kept, and the first one was evicted.
+    assert lint_counts("SELECT e+f FROM tbl;\n") == (1, 0)
+    assert lint_counts("SELECT a+b FROM tbl;\n") == (0, 1)
+    # Which evicted the second (rather than the more recently used third).
+    assert lint_counts("SELECT e+f FROM tbl;\n") == (1, 0)
+    assert lint_counts("SELECT c+d FROM tbl;\n") == (0, 1)
+    assert len(cache._results) == 2
+
+
+def test__rules__cache_rule_code():
+    """Test rules of the same class and config don't share results by code."""
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L006")))
+    crawler = lntr.get_ruleset()[0]
+    other = copy.copy(crawler)
+    other.code = "L906"
+    dialect = lntr.config.get("dialect_obj")
+    tree = lntr.parse_string("select a+b from tbl;\n").tree
+    tree.index_types()
+    statement = tree.segments[0]
+    key = StatementCache.statement_key(statement, dialect)
+    cache = StatementCache()
+    cache.store(crawler, key, statement, [], [])
+    assert cache.lookup(crawler, key, statement) == ([], [])
+    assert cache.lookup(other, key, statement) is None
+
+
+def test__rules__cache_stats(tmpdir):
+    """Test the hits and misses of the cache are reported in the stats."""
+    for idx in range(2):
+        with open(str(tmpdir.join(f"{idx}.sql")), "w") as f:
+            f.write("SELECT a+b FROM tbl;\n")
+    lntr = Linter(config=FluffConfig(overrides=dict(rules="L006")))
+    result = lntr.lint_paths((str(tmpdir),))
+    assert result.stats()["statement_cache"] == dict(hits=1, misses=1)
+    assert "statement cache: 1 hits, 1 misses" in format_rule_timings(result)
+    # It isn't used at all when it's turned off.
+    lntr = Linter(
+        config=FluffConfig(overrides=dict(rules="L006", cache_statements=False))
+    )
+    result = lntr.lint_paths((str(tmpdir),))
+    assert result.stats()["statement_cache"] == dict(hits=0, misses=0)
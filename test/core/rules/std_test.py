@@ -1,11 +1,15 @@
 """Tests for the standard set of rules."""
+
+import sys
 from typing import NamedTuple
 
 import pytest
 
 from sqlfluff.core import Linter
 from sqlfluff.core.errors import SQLParseError
-from sqlfluff.core.rules.base import BaseCrawler, LintResult, LintFix
+from sqlfluff.core.dialects import ansi_dialect
+from sqlfluff.core.parser import BaseSegment, FilePositionMarker, RawSegment
+from sqlfluff.core.rules.base import BaseCrawler, LintResult, LintFix, MultiCrawler
 from sqlfluff.core.rules import std_rule_set
 from sqlfluff.core.rules.doc_decorators import document_configuration
 from sqlfluff.core.config import FluffConfig
@@ -142,6 +146,114 @@ def test__rules__user_rules():
     assert not any(rule[0] == "T042" for rule in linter.rule_tuples())
 
 
+class Rule_T002(BaseCrawler):
+    """A dummy rule which reports what it can see at each raw segment.
+
+    It gives up on the select clause, like rules do for unparsable
+    segments, and so it sees a different raw stack to other rules.
+    """
+
+    def _eval(self, segment, raw_stack, memory, **kwargs):
+        if segment.is_type("select_clause"):
+            raise ValueError("Not selects")
+        count = memory.get("count", 0) + 1
+        if segment.segments:
+            return LintResult(memory={"count": count})
+        return LintResult(
+            anchor=segment,
+            memory={"count": count},
+            description="{0} {1}".format(len(raw_stack), count),
+        )
+
+
+@pytest.mark.parametrize(
+    "sql",
+    ["SELECT a, b FROM tbl\n", "SELECT a FROM tbl WHERE ???\n  AND  c = 1\n"],
+)
+def test__rules__multi_crawler(sql):
+    """Test crawling all the rules at once matches crawling each in turn."""
+    linter = Linter()
+    parsed = linter.parse_string(sql)
+    dialect = linter.config.get("dialect_obj")
+    crawlers = linter.get_ruleset() + [Rule_T002("T002", "A dummy rule.")]
+    results = MultiCrawler(crawlers).crawl(parsed.tree, dialect)
+    assert len(results) == len(crawlers)
+    for crawler, (vs, fixes) in zip(crawlers, results):
+        expected_vs, _, expected_fixes, _ = crawler.crawl(parsed.tree, dialect)
+        assert [v.get_info_dict() for v in vs] == [
+            v.get_info_dict() for v in expected_vs
+        ]
+        assert fixes == expected_fixes
+
+
+class Rule_T003(BaseCrawler):
+    """A dummy rule which reports every segment it's evaluated on."""
+
+    _crawl_types = ("keyword", "select_clause")
+
+    def _eval(self, segment, **kwargs):
+        return LintResult(anchor=segment, description=segment.type)
+
+
+class Rule_T004(Rule_T003):
+    """A dummy rule which is only evaluated on raw keywords."""
+
+    _crawl_raw_only = True
+
+
+class Rule_T005(Rule_T003):
+    """A dummy rule which reports every code segment it's evaluated on.
+
+    It defines its own `_eval`, so doesn't inherit `_crawl_types`.
+    """
+
+    def _eval(self, segment, **kwargs):
+        if segment.is_code and not segment.segments:
+            return LintResult(anchor=segment, description=segment.type)
+        return None
+
+
+@pytest.mark.parametrize(
+    "rule,types",
+    [
+        (Rule_T003, ["select_clause", "keyword", "keyword"]),
+        (Rule_T004, ["keyword", "keyword"]),
+        (Rule_T005, ["keyword", "identifier", "keyword", "identifier"]),
+    ],
+)
+def test__rules__crawl_types(rule, types):
+    """Test rules are only evaluated on the segments they crawl."""
+    linter = Linter()
+    parsed = linter.parse_string("SELECT a FROM tbl\n")
+    dialect = linter.config.get("dialect_obj")
+    crawler = rule("T003", "A dummy rule.")
+    vs, _, _, _ = crawler.crawl(parsed.tree, dialect)
+    assert [v.description for v in vs] == types
+    ((multi_vs, _),) = MultiCrawler([crawler]).crawl(parsed.tree, dialect)
+    assert [v.description for v in multi_vs] == types
+
+
+class NestedSegment(BaseSegment):
+    """A segment for building deep trees."""
+
+    type = "nested"
+
+
+def test__rules__crawl_deep_tree():
+    """Test crawling trees deeper than the recursion limit."""
+    depth = sys.getrecursionlimit() + 100
+    tree = RawSegment("a", FilePositionMarker())
+    for _ in range(depth):
+        tree = NestedSegment([tree], validate=False)
+    crawler = Rule_T002("T002", "A dummy rule.")
+    # Every segment is evaluated, and the raw is last.
+    expected = ["0 {0}".format(depth + 1)]
+    vs, _, _, _ = crawler.crawl(tree, ansi_dialect)
+    assert [v.description for v in vs] == expected
+    ((multi_vs, _),) = MultiCrawler([crawler]).crawl(tree, ansi_dialect)
+    assert [v.description for v in multi_vs] == expected
+
+
 def test__rules__runaway_fail_catch():
     """Test that we catch runaway rules."""
     runaway_limit = 5
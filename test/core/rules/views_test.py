@@ -0,0 +1,60 @@
+"""Tests for the views of segments used when crawling."""
+
+from collections.abc import Sequence
+import copy
+import pickle
+
+import pytest
+
+from sqlfluff.core.rules.views import ParentStackView, SegmentSequenceView
+
+
+@pytest.mark.parametrize(
+    "view,expected",
+    [
+        (SegmentSequenceView(["a", "b", "c", "d"]), ("a", "b", "c", "d")),
+        (SegmentSequenceView(("a", "b", "c", "d"), 1), ("b", "c", "d")),
+        (SegmentSequenceView(("a", "b", "c", "d"), 1, 3), ("b", "c")),
+        (SegmentSequenceView(("a", "b"), 1, 1), ()),
+        (ParentStackView.from_segments(("a", "b", "c")), ("a", "b", "c")),
+        (ParentStackView(), ()),
+    ],
+)
+def test__rules__views_as_tuple(view, expected):
+    """Test the views behave like the tuples they replace."""
+    assert len(view) == len(expected)
+    assert bool(view) == bool(expected)
+    assert tuple(view) == expected
+    assert tuple(reversed(view)) == expected[::-1]
+    assert view == expected
+    assert expected == view
+    assert hash(view) == hash(expected)
+    assert repr(view) == repr(expected)
+    assert view + ("z",) == expected + ("z",)
+    assert ("z",) + view == ("z",) + expected
+    assert view[1:] == expected[1:]
+    assert view[::-1] == expected[::-1]
+    for idx in range(-len(expected), len(expected)):
+        assert view[idx] == expected[idx]
+    with pytest.raises(IndexError):
+        view[len(expected)]
+    assert ("b" in view) == ("b" in expected)
+    assert isinstance(view, Sequence)
+    # Copies and pickles are just tuples.
+    assert copy.copy(view) == expected
+    assert type(pickle.loads(pickle.dumps(view))) is tuple
+    assert pickle.loads(pickle.dumps(view)) == expected
+
+
+def test__rules__views_share_segments():
+    """Test the views don't change when what they share changes."""
+    raw_segments = ["a", "b"]
+    raw_stack = SegmentSequenceView(raw_segments)
+    raw_segments.append("c")
+    assert raw_stack == ("a", "b")
+    assert SegmentSequenceView(raw_segments) == ("a", "b", "c")
+
+    parents = ParentStackView.from_segments(("a", "b"))
+    assert parents.push("c") == ("a", "b", "c")
+    assert parents.push("d")[-1] == "d"
+    assert parents == ("a", "b")
@@ -1,8 +1,16 @@
 """Test the helpers."""
 
+import io
+
 import pytest
 
-from sqlfluff.core.string_helpers import findall
+from sqlfluff.core.dialects import dialect_selector
+from sqlfluff.core.string_helpers import (
+    can_split_statements,
+    findall,
+    iter_statement_chunks,
+    iter_stream_statement_chunks,
+)
 
 
 @pytest.mark.parametrize(
@@ -17,3 +25,143 @@ from sqlfluff.core.string_helpers import findall
 def test__parser__helper_findall(mainstr, substr, positions):
     """Test _findall."""
     assert list(findall(substr, mainstr)) == positions
+
+
+@pytest.mark.parametrize(
+    "buff,chunks",
+    [
+        (b"", []),
+        (b"select 1", [b"select 1"]),
+        (b"select 1;\nselect 2;\n", [b"select 1;\n", b"select 2;\n"]),
+        # Whitespace and comments up to the end of the line go with the
+        # statement, and statements on the same line stay together.
+        (b"select 1; \nselect 2", [b"select 1; \n", b"select 2"]),
+        (b"select 1; -- a\nselect 2", [b"select 1; -- a\n", b"select 2"]),
+        (b"select 1;select 2;\n", [b"select 1;select 2;\n"]),
+        (b"select 1; /* a\n */ select 2;", [b"select 1; /* a\n */ select 2;"]),
+        # Trailing whitespace goes with the last statement.
+        (b"select 1;\n\n  \n", [b"select 1;\n\n  \n"]),
+        # Semicolons in quotes and comments don't split.
+        (
+            b"select ';', \"a;\", `b;` -- c;\n/* d; */ from x;\nselect 'e\\';'",
+            [b"select ';', \"a;\", `b;` -- c;\n/* d; */ from x;\n", b"select 'e\\';'"],
+        ),
+        # Nor do semicolons in dollar quoted bodies or BEGIN ... END blocks.
+        (
+            b"create function f() as $$\nselect 1;\n$$;\nselect 2;\n",
+            [b"create function f() as $$\nselect 1;\n$$;\n", b"select 2;\n"],
+        ),
+        (
+            b"begin\nselect 1;\nif a then\nselect 2;\nend if;\nend;\nselect 3;\n",
+            [
+                b"begin\nselect 1;\nif a then\nselect 2;\nend if;\nend;\n",
+                b"select 3;\n",
+            ],
+        ),
+        # But they do after a BEGIN which starts a transaction.
+        (b"begin;\nselect 1;\n", [b"begin;\n", b"select 1;\n"]),
+        (
+            b"begin isolation level serializable;\nselect 1;\n",
+            [b"begin isolation level serializable;\n", b"select 1;\n"],
+        ),
+        # Or a BEGIN which isn't a block at all (e.g. a column).
+        (
+            b"select begin, a\nfrom x;\nselect 2;\nselect 3 as begin;\nselect 4;\n",
+            [
+                b"select begin, a\nfrom x;\n",
+                b"select 2;\n",
+                b"select 3 as begin;\n",
+                b"select 4;\n",
+            ],
+        ),
+        (
+            b"select case when a then begin end;\nselect 2;\n",
+            [b"select case when a then begin end;\n", b"select 2;\n"],
+        ),
+        # Blocks are recognised after the start of a routine body, too.
+        (
+            b"create procedure p() as begin\nselect 1;\nend;\nselect 2;\n",
+            [b"create procedure p() as begin\nselect 1;\nend;\n", b"select 2;\n"],
+        ),
+        (
+            b"create procedure p()\n-- a\nbegin\nselect 1;\nend;\nselect 2;\n",
+            [
+                b"create procedure p()\n-- a\nbegin\nselect 1;\nend;\n",
+                b"select 2;\n",
+            ],
+        ),
+        # Once we can't lex, we can't tell where the statements end.
+        (b"select 'a;\nselect 2;\n", [b"select 'a;\nselect 2;\n"]),
+    ],
+)
+def test__parser__helper_iter_statement_chunks(buff, chunks):
+    """Test iter_statement_chunks."""
+    lexer_struct = dialect_selector("ansi").get_lexer_struct()
+    assert list(iter_statement_chunks(buff, lexer_struct)) == chunks
+
+
+@pytest.mark.parametrize(
+    "buff,dialect,chunks",
+    [
+        # A hash only starts a comment in some dialects.
+        (b"select 1 # a;\nselect 2;\n", "ansi", [b"select 1 # a;\nselect 2;\n"]),
+        (b"select 1 # a;\nselect 2;\n", "exasol", [b"select 1 # a;\n", b"select 2;\n"]),
+        # As does a backslash escape a quote.
+        (b"select 'a\\';\nselect 2;\n", "ansi", [b"select 'a\\';\nselect 2;\n"]),
+        (
+            b"select 'a\\';\nselect 2;\n",
+            "snowflake",
+            [b"select 'a\\';\n", b"select 2;\n"],
+        ),
+    ],
+)
+def test__parser__helper_iter_statement_chunks_dialect(buff, dialect, chunks):
+    """Test iter_statement_chunks lexes as the dialect does."""
+    lexer_struct = dialect_selector(dialect).get_lexer_struct()
+    assert list(iter_statement_chunks(buff, lexer_struct)) == chunks
+
+
+def test__parser__helper_iter_statement_chunks_max_block_size():
+    """Test a block with no end doesn't keep the rest of the buffer together."""
+    lexer_struct = dialect_selector("ansi").get_lexer_struct()
+    buff = b"begin foo;\n" + b"select 1;\n" * 10
+    assert list(iter_statement_chunks(buff, lexer_struct)) == [buff]
+    assert (
+        list(iter_statement_chunks(buff, lexer_struct, max_block_size=25))
+        == [b"begin foo;\nselect 1;\nselect 1;\n"] + [b"select 1;\n"] * 8
+    )
+
+
+@pytest.mark.parametrize("read_size", [1, 4, 64 * 1024])
+@pytest.mark.parametrize(
+    "buff",
+    [
+        b"",
+        b"select 1;\nselect 2;\n\n",
+        b"select 1 /* a\n; */;\nselect 'b\n;';\nselect 3",
+        b"create function f() as $$\nselect 1;\n$$;\nselect 2;\n",
+        b"begin\nselect 1;\nend;\nselect begin from x;\nselect 2;\n",
+    ],
+)
+def test__parser__helper_iter_stream_statement_chunks(buff, read_size):
+    """Test a stream is split as it would be read all at once."""
+    lexer_struct = dialect_selector("ansi").get_lexer_struct()
+    assert list(
+        iter_stream_statement_chunks(io.BytesIO(buff), lexer_struct, read_size)
+    ) == list(iter_statement_chunks(buff, lexer_struct))
+
+
+def test__parser__helper_iter_stream_statement_chunks_lazy():
+    """Test each chunk of a stream is returned before the rest is read."""
+    lexer_struct = dialect_selector("ansi").get_lexer_struct()
+    stream = io.BytesIO(b"select 1;\n" * 100)
+    chunks = iter_stream_statement_chunks(stream, lexer_struct, read_size=32)
+    assert next(chunks) == b"select 1;\n"
+    assert stream.tell() == 32
+    assert len(list(chunks)) == 99
+
+
+def test__parser__helper_can_split_statements():
+    """Test dialects with their own statement terminators aren't split."""
+    assert can_split_statements(dialect_selector("ansi").get_lexer_struct())
+    assert not can_split_statements(dialect_selector("exasol_fs").get_lexer_struct())
@@ -136,6 +136,9 @@ COMPLEX_RAW_SLICED_FILE = [
         (SIMPLE_SOURCE_STR, SIMPLE_TEMPLATED_STR, SIMPLE_SLICED_FILE, 0, 1, 1),
         (SIMPLE_SOURCE_STR, SIMPLE_TEMPLATED_STR, SIMPLE_SLICED_FILE, 20, 3, 1),
         (SIMPLE_SOURCE_STR, SIMPLE_TEMPLATED_STR, SIMPLE_SLICED_FILE, 24, 3, 5),
+        # Either side of a newline
+        (SIMPLE_SOURCE_STR, SIMPLE_TEMPLATED_STR, SIMPLE_SLICED_FILE, 5, 1, 6),
+        (SIMPLE_SOURCE_STR, SIMPLE_TEMPLATED_STR, SIMPLE_SLICED_FILE, 6, 2, 1),
     ],
 )
 def test__templated_file_get_line_pos_of_char_pos(
@@ -306,3 +309,30 @@ def test__templated_file_source_only_slices():
         ],
     )
     assert file.source_only_slices() == [RawFileSlice("b" * 7, "comment", 10)]
+
+
+@pytest.mark.parametrize(
+    "source_slice,is_literal",
+    [
+        # Within a literal.
+        (slice(0, 5), True),
+        # Zero length, even within a templated section.
+        (slice(83, 83), True),
+        # Starting within a templated section.
+        (slice(83, 90), False),
+        # Spanning a templated section.
+        (slice(70, 90), False),
+        # Up to, but not including, a templated section.
+        (slice(68, 81), True),
+        # Starting at the end of a templated section.
+        (slice(86, 100), True),
+    ],
+)
+def test__templated_file_is_source_slice_literal(source_slice, is_literal):
+    """Test TemplatedFile.is_source_slice_literal."""
+    file = TemplatedFile(
+        source_str="Dummy String",
+        sliced_file=COMPLEX_SLICED_FILE,
+        raw_sliced=COMPLEX_RAW_SLICED_FILE,
+    )
+    assert file.is_source_slice_literal(source_slice) == is_literal